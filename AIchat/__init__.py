@@ -1,5 +1,5 @@
-from .AIchat import chat
-
-
-async def setup(bot):
-    await bot.add_cog(chat(bot))
+from .AIchat import chat
+
+
+async def setup(bot):
+    await bot.add_cog(chat(bot))
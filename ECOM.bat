@@ -1,6 +1,8 @@
 @ECHO OFF
 :RED
 CALL "%userprofile%\redenv\Scripts\activate.bat"
+REM The cogs import the shared cogcore package from this repo; install it once, editable
+python -m pip show -q cogcore >NUL 2>&1 || python -m pip install -e "%~dp0."
 python -O -m redbot ECOM --team-members-are-owners
 
 IF %ERRORLEVEL% == 1 GOTO RESTART_RED
@@ -1,5 +1,5 @@
-from .businesschat import bchat
-
-
-async def setup(bot):
-    await bot.add_cog(bchat(bot))
+from .businesschat import bchat
+
+
+async def setup(bot):
+    await bot.add_cog(bchat(bot))
@@ -1,5 +1,5 @@
-from .code import code
-
-
-async def setup(bot):
-    await bot.add_cog(code(bot))
+from .code import code
+
+
+async def setup(bot):
+    await bot.add_cog(code(bot))
@@ -0,0 +1,157 @@
+import asyncio
+import concurrent.futures
+import hashlib
+import json
+import pathlib
+import sqlite3
+import time
+from typing import Any, Dict, Optional
+
+MAX_CACHE_BYTES: int = 50 * 1024 * 1024  # Response text kept on disk before evicting
+
+
+def cache_key(
+    model: str, params: Dict[str, Any], system_prompt: str, prompt: str
+) -> str:
+    """Hash of everything that shapes a first-turn reply.
+
+    The prompt is case- and whitespace-normalized so trivially different
+    spellings of the same ask share one entry.
+    """
+    normalized = " ".join(prompt.split()).casefold()
+    payload = json.dumps([model, params, system_prompt, normalized], sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """Exact-match LLM reply cache in SQLite with size-bounded LRU eviction.
+
+    Once the stored text passes ``max_bytes`` the least recently used entries
+    are deleted. All SQLite work runs on a single dedicated thread.
+    """
+
+    def __init__(self, path: pathlib.Path, max_bytes: int = MAX_CACHE_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._db: Optional[sqlite3.Connection] = None
+        self._executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="responsecache"
+        )
+
+    async def get(self, key: str) -> Optional[str]:
+        """The cached reply for ``key``, marking it as recently used."""
+        response = await self._run(self._get, key)
+        if response is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return response
+
+    async def put(self, key: str, response: str) -> None:
+        """Store a reply, evicting old entries if the cache grows past its size."""
+        await self._run(self._put, key, response)
+
+    async def clear(self) -> None:
+        """Drop every entry and reset the hit counters."""
+        self.hits = self.misses = 0
+        await self._run(self._clear)
+
+    async def stats(self) -> Dict[str, float]:
+        """Hit/miss counters since load plus the entries and bytes on disk."""
+        entries, size = await self._run(self._totals)
+        looked_up = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / looked_up * 100 if looked_up else 0.0,
+            "entries": entries,
+            "bytes": size,
+        }
+
+    async def close(self) -> None:
+        """Close the database and stop the worker thread."""
+        await self._run(self._close)
+        self._executor.shutdown(wait=True)
+
+    async def _run(self, func, *args):
+        return await asyncio.get_running_loop().run_in_executor(
+            self._executor, func, *args
+        )
+
+    # The methods below only ever run on the cache's single worker thread
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._db is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(self.path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, response TEXT NOT NULL, "
+                "size INTEGER NOT NULL, last_used REAL NOT NULL)"
+            )
+            self._db.execute(
+                "CREATE INDEX IF NOT EXISTS responses_last_used ON responses (last_used)"
+            )
+            self._db.commit()
+        return self._db
+
+    def _get(self, key: str) -> Optional[str]:
+        db = self._connect()
+        row = db.execute(
+            "SELECT response FROM responses WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        with db:
+            db.execute(
+                "UPDATE responses SET last_used = ? WHERE key = ?", (time.time(), key)
+            )
+        return row[0]
+
+    def _put(self, key: str, response: str) -> None:
+        db = self._connect()
+        size = len(response.encode("utf-8"))
+        with db:
+            db.execute(
+                "INSERT INTO responses (key, response, size, last_used) "
+                "VALUES (?, ?, ?, ?) ON CONFLICT(key) DO UPDATE SET "
+                "response = excluded.response, size = excluded.size, "
+                "last_used = excluded.last_used",
+                (key, response, size, time.time()),
+            )
+            total = db.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM responses"
+            ).fetchone()[0]
+            if total <= self.max_bytes:
+                return
+            # Walk from the least recently used entry until enough is freed
+            evicted = []
+            for old_key, old_size in db.execute(
+                "SELECT key, size FROM responses ORDER BY last_used"
+            ):
+                if total <= self.max_bytes:
+                    break
+                evicted.append((old_key,))
+                total -= old_size
+            db.executemany("DELETE FROM responses WHERE key = ?", evicted)
+
+    def _totals(self):
+        return (
+            self._connect()
+            .execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses")
+            .fetchone()
+        )
+
+    def _clear(self) -> None:
+        db = self._connect()
+        with db:
+            db.execute("DELETE FROM responses")
+
+    def _close(self) -> None:
+        if self._db is not None:
+            self._db.close()
+            self._db = None
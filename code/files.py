@@ -0,0 +1,164 @@
+import io
+import re
+import zipfile
+from typing import Dict, List, Optional, Tuple
+
+# Fence info string -> file extension
+LANGUAGE_EXTENSIONS: Dict[str, str] = {
+    "python": "py",
+    "py": "py",
+    "javascript": "js",
+    "js": "js",
+    "jsx": "jsx",
+    "typescript": "ts",
+    "ts": "ts",
+    "tsx": "tsx",
+    "html": "html",
+    "css": "css",
+    "scss": "scss",
+    "json": "json",
+    "yaml": "yml",
+    "yml": "yml",
+    "toml": "toml",
+    "ini": "ini",
+    "xml": "xml",
+    "sql": "sql",
+    "bash": "sh",
+    "sh": "sh",
+    "shell": "sh",
+    "zsh": "sh",
+    "powershell": "ps1",
+    "ps1": "ps1",
+    "bat": "bat",
+    "c": "c",
+    "cpp": "cpp",
+    "c++": "cpp",
+    "csharp": "cs",
+    "cs": "cs",
+    "java": "java",
+    "kotlin": "kt",
+    "go": "go",
+    "rust": "rs",
+    "ruby": "rb",
+    "php": "php",
+    "swift": "swift",
+    "lua": "lua",
+    "r": "r",
+    "markdown": "md",
+    "md": "md",
+    "text": "txt",
+    "txt": "txt",
+    "env": "env",
+}
+KNOWN_EXTENSIONS = frozenset(LANGUAGE_EXTENSIONS.values())
+# Languages whose files have a fixed name instead of an extension
+LANGUAGE_FILENAMES: Dict[str, str] = {
+    "dockerfile": "Dockerfile",
+    "makefile": "Makefile",
+}
+
+_FENCE = re.compile(r"^(`{3,}|~{3,})[ \t]*([^\n`]*)\n(.*?)^\1[ \t]*$", re.M | re.S)
+_FILENAME = re.compile(r"(?:[\w-]+/)*[\w-]+\.([A-Za-z0-9]+)")
+# Markdown and comment syntax around a file name on a line of its own
+_DECORATION = re.compile(
+    r"^[\s#*_`>\-/;!<]*(?:file(?:name)?\s*:\s*)?|[\s*_`:>\-/]*$", re.I
+)
+_TREE = re.compile(r"[├└│]──|^\s*\[?[\w-]+\]?/\s*$", re.M)
+
+
+class CodeBlock:
+    """One fenced block of a reply and the file it should be saved as."""
+
+    __slots__ = ("filename", "language", "content")
+
+    def __init__(self, filename: Optional[str], language: str, content: str):
+        self.filename = filename
+        self.language = language
+        self.content = content
+
+
+def _as_filename(line: str) -> Optional[str]:
+    """The file name ``line`` consists of, if that's all it holds.
+
+    Only whole labels such as ``**app.py**``, ``# app.py`` or ``File: app.py``
+    count, and only with a known extension, so mentions of ``os.path`` or
+    ``discord.py`` in a sentence aren't mistaken for file names.
+    """
+    name = _DECORATION.sub("", line)
+    match = _FILENAME.fullmatch(name)
+    if match and match.group(1).lower() in KNOWN_EXTENSIONS:
+        return name
+    return None
+
+
+def parse_blocks(text: str) -> List[CodeBlock]:
+    """Split a reply into its fenced code blocks, in order.
+
+    The file name comes from the fence info string (```` ```python app.py ````),
+    a comment on the block's first line, or the last line of prose before the
+    fence, in that order; blocks without one get ``filename=None``.
+    """
+    blocks = []
+    previous_end = 0
+    for match in _FENCE.finditer(text):
+        info = match.group(2).split()
+        content = match.group(3)
+        language = info[0].lower() if info else ""
+
+        filename = next(filter(None, map(_as_filename, info[1:] or info)), None)
+        if filename is None:
+            filename = _as_filename(content.split("\n", 1)[0])
+        if filename is None:
+            prose = text[previous_end : match.start()].strip().splitlines()
+            if prose:
+                filename = _as_filename(prose[-1])
+        if filename is None and not language and _TREE.search(content):
+            filename = "file_tree.txt"
+
+        blocks.append(CodeBlock(filename, language, content))
+        previous_end = match.end()
+    return blocks
+
+
+def _unique(name: str, taken: set) -> str:
+    stem, dot, extension = name.rpartition(".")
+    if not dot:
+        stem, extension = name, ""
+    candidate, n = name, 1
+    while candidate in taken:
+        n += 1
+        candidate = f"{stem}_{n}.{extension}" if dot else f"{stem}_{n}"
+    taken.add(candidate)
+    return candidate
+
+
+def package(text: str, stem: str) -> Tuple[str, bytes]:
+    """The file to send for a reply, as ``(filename, data)``, built in memory.
+
+    A single code block is sent as that file, several are zipped together
+    under their own names, and a reply without fences is sent as plain text.
+    """
+    blocks = parse_blocks(text)
+    if not blocks:
+        return f"{stem}.txt", text.encode("utf-8")
+
+    taken: set = set()
+    files = []
+    for i, block in enumerate(blocks, 1):
+        name = block.filename
+        if name is None:
+            name = LANGUAGE_FILENAMES.get(block.language)
+        if name is None:
+            extension = LANGUAGE_EXTENSIONS.get(block.language, "txt")
+            name = f"{stem}_{i}.{extension}"
+        files.append((_unique(name, taken), block.content))
+
+    if len(files) == 1:
+        name, content = files[0]
+        return name.rsplit("/", 1)[-1], content.encode("utf-8")
+
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+        for name, content in files:
+            archive.writestr(name, content)
+    return f"{stem}.zip", buffer.getvalue()
@@ -0,0 +1,126 @@
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional
+
+from .llm import GroqService
+from .store import Conversation, HistoryStore
+from .tokens import Turn
+
+log = logging.getLogger("red.cogcore.compaction")
+
+SUMMARY_MODEL: str = "llama-3.1-8b-instant"  # Cheap, fast model used only for summaries
+# Fraction of the history budget that triggers compaction
+COMPACT_THRESHOLD: float = 0.75
+KEEP_RECENT_TURNS: int = 4  # Newest turns that are always left verbatim
+MAX_SUMMARY_TOKENS: int = 512
+MAX_TURN_CHARS: int = 2000  # Long replies are clipped before being summarized
+SUMMARY_TIMEOUT_SECONDS: float = 60.0
+
+SUMMARY_PROMPT = """You maintain a running summary of a conversation between a user and an AI assistant.
+Merge the existing summary (if any) with the new messages into one concise summary.
+Keep names, facts, decisions, preferences and open questions; drop pleasantries and repetition.
+Write in plain prose, at most a few short paragraphs, and output only the summary."""
+
+
+class Compactor:
+    """Fold the oldest turns of a conversation into a rolling summary in the background.
+
+    ``HistoryManager`` calls ``maybe_schedule`` for every message and reply;
+    when the conversation passes ``threshold`` of its budget a task summarizes
+    everything but the newest ``keep_recent`` turns with ``model`` and replaces
+    them with the summary. At most one compaction runs per conversation at a time.
+    """
+
+    def __init__(
+        self,
+        groq: GroqService,
+        cog_name: str,
+        model: str = SUMMARY_MODEL,
+        threshold: float = COMPACT_THRESHOLD,
+        keep_recent: int = KEEP_RECENT_TURNS,
+    ):
+        self.groq = groq
+        self.cog_name = cog_name
+        self.model = model
+        self.threshold = threshold
+        self.keep_recent = keep_recent
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+    def maybe_schedule(
+        self, store: HistoryStore, key: Any, conversation: Conversation, budget: int
+    ) -> None:
+        """Start a compaction for ``key`` if it is over the threshold and not already running."""
+        key = str(key)
+        if key in self._tasks or len(conversation.turns) <= self.keep_recent:
+            return
+        if conversation.tokens <= budget * self.threshold:
+            return
+        task = asyncio.get_running_loop().create_task(self._compact(store, key))
+        self._tasks[key] = task
+        task.add_done_callback(lambda _: self._tasks.pop(key, None))
+
+    async def close(self) -> None:
+        """Cancel any compactions still running."""
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _compact(self, store: HistoryStore, key: str) -> None:
+        try:
+            conversation = await store.load(key)
+            folded = conversation.turns[: -self.keep_recent]
+            # Keep a trailing question together with its reply in the verbatim window
+            while folded and folded[-1].role == "user":
+                folded.pop()
+            if not folded:
+                return
+
+            previous = conversation.summary
+            async with asyncio.timeout(SUMMARY_TIMEOUT_SECONDS):
+                summary = await self.summarize(
+                    previous.content if previous else None, folded
+                )
+            if not summary:
+                return
+
+            # The conversation may have been trimmed, cleared or reloaded meanwhile
+            conversation = await store.load(key)
+            folded_ids = {id(turn) for turn in folded}
+            if conversation.summary is not previous or not any(
+                id(turn) in folded_ids for turn in conversation.turns
+            ):
+                return
+            conversation.turns[:] = [
+                turn for turn in conversation.turns if id(turn) not in folded_ids
+            ]
+            conversation.summary = Turn(
+                "system", f"Summary of the earlier conversation:\n{summary}"
+            )
+            store.mark_dirty(key)
+            log.debug(f"Compacted {len(folded)} turns for {key}")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            log.warning(f"Compaction failed for {key}: {e}")
+
+    async def summarize(
+        self, previous: Optional[str], turns: List[Turn]
+    ) -> Optional[str]:
+        """Ask the summary model to merge ``turns`` into ``previous``."""
+        transcript = "\n\n".join(
+            f"{turn.role.upper()}: {turn.content[:MAX_TURN_CHARS]}" for turn in turns
+        )
+        content = (
+            f"Existing summary:\n{previous or '(none)'}\n\nNew messages:\n{transcript}"
+        )
+        return await self.groq.complete(
+            self.cog_name,
+            model=self.model,
+            messages=[
+                {"role": "system", "content": SUMMARY_PROMPT},
+                {"role": "user", "content": content},
+            ],
+            temperature=0.2,
+            max_tokens=MAX_SUMMARY_TOKENS,
+        )
@@ -0,0 +1,234 @@
+import ast
+import functools
+import inspect
+import operator
+from typing import Any, Callable, Dict, FrozenSet, Iterable, Mapping, Optional
+
+import numpy as np
+
+MAX_EXPRESSION_LENGTH: int = 500  # Characters accepted in one user-written expression
+MAX_EXPRESSION_NODES: int = 200  # Syntax tree size accepted in one expression
+SAMPLE_ROWS: int = 2  # Rows of the sample arrays a new expression is tried on
+
+
+def _minimum(first: Any, *rest: Any) -> Any:
+    return functools.reduce(np.minimum, rest, first)
+
+
+def _maximum(first: Any, *rest: Any) -> Any:
+    return functools.reduce(np.maximum, rest, first)
+
+
+DEFAULT_FUNCTIONS: Dict[str, Callable[..., Any]] = {
+    "abs": np.abs,
+    "min": _minimum,
+    "max": _maximum,
+}
+
+_COMPARISONS = {
+    ast.Lt: operator.lt,
+    ast.LtE: operator.le,
+    ast.Gt: operator.gt,
+    ast.GtE: operator.ge,
+    ast.Eq: operator.eq,
+    ast.NotEq: operator.ne,
+}
+_ARITHMETIC = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+}
+_UNARY = {ast.USub: operator.neg, ast.UAdd: operator.pos}
+
+
+class ExpressionError(ValueError):
+    """Raised when an expression uses syntax or names that aren't allowed."""
+
+
+def _truth(value: Any) -> Any:
+    """Element-wise truth of an operand of and/or/not; NaN counts as false."""
+    value = np.asarray(value)
+    if value.dtype == bool:
+        return value
+    with np.errstate(invalid="ignore"):
+        return (value != 0) & ~np.isnan(value)
+
+
+def _takes(func: Callable[..., Any], count: int) -> bool:
+    """Whether ``func`` can be called with ``count`` positional arguments."""
+    if isinstance(func, np.ufunc):
+        # Extra arguments to a ufunc are taken as output arrays
+        return count == func.nin
+    try:
+        inspect.signature(func).bind(*range(count))
+    except TypeError:
+        return False
+    except ValueError:  # No signature available; let the dry run decide
+        return True
+    return True
+
+
+class Expression:
+    """A user-written condition compiled once and evaluated over whole arrays.
+
+    ``and``, ``or`` and ``not`` are applied element-wise and chained
+    comparisons such as ``20 < rsi < 40`` are split up, so the same
+    expression works on scalars and on NumPy arrays (one element per row).
+    Only arithmetic, comparisons, numbers, the allowed names and the allowed
+    functions can appear; anything else is rejected when compiling.
+    """
+
+    __slots__ = ("source", "names", "_evaluate")
+
+    def __init__(
+        self,
+        source: str,
+        names: FrozenSet[str],
+        evaluate: Callable[[Mapping[str, Any]], Any],
+    ):
+        self.source = source
+        self.names = names  # Variables the expression actually reads
+        self._evaluate = evaluate
+
+    def evaluate(self, namespace: Mapping[str, Any]) -> Any:
+        """Evaluate against ``namespace``, which must provide every name in ``names``."""
+        return self._evaluate(namespace)
+
+    def __repr__(self) -> str:
+        return f"Expression({self.source!r})"
+
+
+def compile_expression(
+    source: str,
+    names: Iterable[str],
+    functions: Optional[Mapping[str, Callable[..., Any]]] = None,
+) -> Expression:
+    """Compile ``source`` into an ``Expression`` over the variables in ``names``.
+
+    Names are matched case-insensitively. The expression is tried once on
+    sample arrays, so one that parses but can't be evaluated, or that isn't a
+    true/false condition (a lone ``rsi``), is rejected here rather than when
+    it is first used. Raises ``ExpressionError`` with a message fit to show
+    the user when the expression isn't allowed.
+    """
+    source = source.strip()
+    if not source:
+        raise ExpressionError("The expression is empty.")
+    if len(source) > MAX_EXPRESSION_LENGTH:
+        raise ExpressionError(
+            f"Expressions are limited to {MAX_EXPRESSION_LENGTH} characters."
+        )
+    try:
+        tree = ast.parse(source, mode="eval")
+    except SyntaxError as e:
+        raise ExpressionError(f"Invalid expression: {e.msg}") from None
+    if sum(1 for _ in ast.walk(tree)) > MAX_EXPRESSION_NODES:
+        raise ExpressionError("The expression is too long.")
+
+    compiler = _Compiler(
+        {name.lower() for name in names},
+        {name.lower(): func for name, func in (functions or DEFAULT_FUNCTIONS).items()},
+    )
+    evaluate = compiler.compile(tree.body)
+    expression = Expression(source, frozenset(compiler.used), evaluate)
+    _dry_run(expression)
+    return expression
+
+
+def _dry_run(expression: Expression) -> None:
+    sample = {name: np.ones(SAMPLE_ROWS) for name in expression.names}
+    try:
+        with np.errstate(all="ignore"):
+            result = np.asarray(expression.evaluate(sample))
+            np.broadcast_to(result, SAMPLE_ROWS)
+    except (TypeError, ValueError, ArithmeticError):
+        raise ExpressionError("The expression can't be evaluated.") from None
+    if result.dtype != bool:
+        raise ExpressionError(
+            "The expression must be a condition, e.g. comparisons joined with and/or."
+        )
+
+
+class _Compiler:
+    """Turns a whitelisted syntax tree into nested closures."""
+
+    def __init__(self, names: set, functions: Dict[str, Callable[..., Any]]):
+        self.names = names
+        self.functions = functions
+        self.used: set = set()
+
+    def compile(self, node: ast.AST) -> Callable[[Mapping[str, Any]], Any]:
+        if isinstance(node, ast.Constant):
+            value = node.value
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                raise ExpressionError(f"Unsupported value: {value!r}")
+            return lambda ns: value
+
+        if isinstance(node, ast.Name):
+            name = node.id.lower()
+            if name not in self.names:
+                raise ExpressionError(f"Unknown name: {node.id}")
+            self.used.add(name)
+            return lambda ns: ns[name]
+
+        if isinstance(node, ast.BoolOp):
+            parts = [self.compile(value) for value in node.values]
+            combine = np.logical_and if isinstance(node.op, ast.And) else np.logical_or
+
+            def boolean(ns):
+                result = _truth(parts[0](ns))
+                for part in parts[1:]:
+                    result = combine(result, _truth(part(ns)))
+                return result
+
+            return boolean
+
+        if isinstance(node, ast.UnaryOp):
+            operand = self.compile(node.operand)
+            if isinstance(node.op, ast.Not):
+                return lambda ns: np.logical_not(_truth(operand(ns)))
+            op = _UNARY.get(type(node.op))
+            if op is None:
+                raise ExpressionError("Unsupported operator.")
+            return lambda ns: op(operand(ns))
+
+        if isinstance(node, ast.BinOp):
+            op = _ARITHMETIC.get(type(node.op))
+            if op is None:
+                raise ExpressionError("Only +, -, * and / are allowed.")
+            left, right = self.compile(node.left), self.compile(node.right)
+            return lambda ns: op(left(ns), right(ns))
+
+        if isinstance(node, ast.Compare):
+            operands = [self.compile(node.left)] + [
+                self.compile(value) for value in node.comparators
+            ]
+            ops = []
+            for op_node in node.ops:
+                op = _COMPARISONS.get(type(op_node))
+                if op is None:
+                    raise ExpressionError("Unsupported comparison.")
+                ops.append(op)
+
+            def compare(ns):
+                values = [operand(ns) for operand in operands]
+                result = ops[0](values[0], values[1])
+                for i in range(1, len(ops)):
+                    result = result & ops[i](values[i], values[i + 1])
+                return result
+
+            return compare
+
+        if isinstance(node, ast.Call):
+            if not isinstance(node.func, ast.Name) or node.keywords:
+                raise ExpressionError("Unsupported function call.")
+            func = self.functions.get(node.func.id.lower())
+            if func is None:
+                raise ExpressionError(f"Unknown function: {node.func.id}")
+            if not _takes(func, len(node.args)):
+                raise ExpressionError(f"Wrong number of arguments for {node.func.id}()")
+            args = [self.compile(arg) for arg in node.args]
+            return lambda ns: func(*(arg(ns) for arg in args))
+
+        raise ExpressionError(f"Unsupported syntax: {type(node).__name__}")
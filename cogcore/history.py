@@ -0,0 +1,118 @@
+import logging
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+
+from .store import Conversation, HistoryStore
+from .tokens import MESSAGE_OVERHEAD_TOKENS, Turn, count_tokens
+
+if TYPE_CHECKING:
+    from .compaction import Compactor
+
+log = logging.getLogger("red.cogcore.history")
+
+DEFAULT_HISTORY_BUDGET: int = 6000  # Prompt tokens per request, system prompt included
+
+
+class HistoryManager:
+    """Per-user conversation history trimmed to a token budget instead of a turn count.
+
+    ``budgets`` maps a model name to the prompt tokens it may use; models that
+    aren't listed get ``default_budget``. The system prompt is charged against
+    the budget, and the newest user message is always kept. Turns live in a
+    ``HistoryStore``, which is memory-only unless one with a path is passed in.
+    With a ``Compactor``, old turns are folded into a rolling summary before
+    the budget forces them out.
+    """
+
+    def __init__(
+        self,
+        system_prompt: str,
+        default_budget: int = DEFAULT_HISTORY_BUDGET,
+        budgets: Optional[Dict[str, int]] = None,
+        store: Optional[HistoryStore] = None,
+        compactor: Optional["Compactor"] = None,
+    ):
+        self.system_prompt = system_prompt
+        self.system_tokens = count_tokens(system_prompt) + MESSAGE_OVERHEAD_TOKENS
+        self.default_budget = default_budget
+        self.budgets: Dict[str, int] = budgets or {}
+        self.store = store if store is not None else HistoryStore()
+        self.compactor = compactor
+
+    def budget_for(self, model: str) -> int:
+        """Prompt token budget for ``model``."""
+        return self.budgets.get(model, self.default_budget)
+
+    async def build_messages(
+        self, user_id: Any, message: str, model: str
+    ) -> List[Dict[str, str]]:
+        """Record the user's message and return the trimmed prompt for ``model``."""
+        conversation = await self.store.load(user_id)
+        conversation.turns.append(Turn("user", message))
+        budget = self.budget_for(model) - self.system_tokens
+        self._maybe_compact(user_id, conversation, budget)
+        self.trim(conversation, budget)
+        self.store.mark_dirty(user_id)
+
+        messages = [{"role": "system", "content": self.system_prompt}]
+        if conversation.summary is not None:
+            messages.append(conversation.summary.as_message())
+        messages.extend(turn.as_message() for turn in conversation.turns)
+        return messages
+
+    async def is_empty(self, user_id: Any) -> bool:
+        """Whether the user has no turns or summary yet."""
+        conversation = await self.store.load(user_id)
+        return not conversation.turns and conversation.summary is None
+
+    async def add_reply(
+        self, user_id: Any, reply: Optional[str], model: Optional[str] = None
+    ) -> None:
+        """Store the assistant's reply; empty replies are not kept.
+
+        Pass the ``model`` the next request will use so a long reply starts
+        compaction now, before that request's trim would drop the oldest turns.
+        """
+        if reply:
+            conversation = await self.store.load(user_id)
+            conversation.turns.append(Turn("assistant", reply))
+            self.store.mark_dirty(user_id)
+            if model is not None:
+                budget = self.budget_for(model) - self.system_tokens
+                self._maybe_compact(user_id, conversation, budget)
+
+    def _maybe_compact(
+        self, user_id: Any, conversation: Conversation, budget: int
+    ) -> None:
+        """Let the compactor, if any, summarize the conversation in the background."""
+        if self.compactor is not None:
+            self.compactor.maybe_schedule(self.store, user_id, conversation, budget)
+
+    async def replace(self, user_id: Any, message: str, reply: str) -> None:
+        """Start the user's history over from a single exchange."""
+        conversation = await self.store.load(user_id)
+        conversation.turns[:] = [Turn("user", message), Turn("assistant", reply)]
+        conversation.summary = None
+        self.store.mark_dirty(user_id)
+
+    @staticmethod
+    def trim(conversation: Conversation, budget: int) -> None:
+        """Drop the oldest turns in place until the rest fit in ``budget`` tokens."""
+        turns = conversation.turns
+        total = conversation.tokens
+        drop = 0
+        while total > budget and drop < len(turns) - 1:
+            total -= turns[drop].tokens
+            drop += 1
+        # Never open the window on a reply whose question was dropped
+        while drop < len(turns) - 1 and turns[drop].role == "assistant":
+            drop += 1
+        if drop:
+            del turns[:drop]
+
+    async def clear(self, user_id: Any) -> bool:
+        """Forget one user's history; returns False if there was none."""
+        return await self.store.delete(user_id)
+
+    async def clear_all(self) -> None:
+        """Forget every user's history."""
+        await self.store.clear()
@@ -0,0 +1,118 @@
+import asyncio
+import logging
+import os
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Optional
+
+import httpx
+from dotenv import load_dotenv
+from groq import AsyncGroq
+
+load_dotenv()
+
+log = logging.getLogger("red.cogcore.llm")
+
+MAX_CONNECTIONS: int = 20  # Upper bound on pooled HTTP connections to the Groq API
+MAX_KEEPALIVE_CONNECTIONS: int = 10  # Idle connections kept warm between requests
+MAX_IN_FLIGHT: int = 16  # Completions allowed in flight across every cog
+DEFAULT_COG_CONCURRENCY: int = 4  # Per-cog limit when a cog doesn't pick one
+REQUEST_TIMEOUT_SECONDS: float = 60.0  # Matches the asyncio.timeout used by the cogs
+CONNECT_TIMEOUT_SECONDS: float = 10.0
+
+
+class GroqService:
+    """One pooled AsyncGroq client plus the concurrency limits shared by the LLM cogs."""
+
+    def __init__(self, api_key: Optional[str] = None, max_in_flight: int = MAX_IN_FLIGHT):
+        self._http = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=MAX_CONNECTIONS,
+                max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS,
+            ),
+            timeout=httpx.Timeout(
+                REQUEST_TIMEOUT_SECONDS, connect=CONNECT_TIMEOUT_SECONDS
+            ),
+        )
+        self.client = AsyncGroq(
+            api_key=api_key or os.getenv("GROQ_API_KEY"), http_client=self._http
+        )
+        self._in_flight = asyncio.Semaphore(max_in_flight)
+        self._cog_limits: Dict[str, asyncio.Semaphore] = {}
+
+    def register(self, cog_name: str, concurrency: int = DEFAULT_COG_CONCURRENCY) -> None:
+        """Register a cog and its own cap on concurrent completions."""
+        self._cog_limits[cog_name] = asyncio.Semaphore(concurrency)
+        log.info(f"Registered {cog_name} with Groq concurrency {concurrency}")
+
+    def unregister(self, cog_name: str) -> bool:
+        """Forget a cog; returns True when no cog is using the service anymore."""
+        self._cog_limits.pop(cog_name, None)
+        return not self._cog_limits
+
+    @asynccontextmanager
+    async def slot(self, cog_name: str) -> AsyncIterator[None]:
+        """Hold one of the cog's slots and one global slot for the duration of a call."""
+        # Take the per-cog slot first so a busy cog never sits on a global slot
+        cog_limit = self._cog_limits.get(cog_name)
+        if cog_limit is None:
+            self.register(cog_name)
+            cog_limit = self._cog_limits[cog_name]
+        async with cog_limit:
+            async with self._in_flight:
+                yield
+
+    async def complete(
+        self,
+        cog_name: str,
+        on_delta: Optional[Callable[[str], Awaitable[None]]] = None,
+        **params: Any,
+    ) -> Optional[str]:
+        """Run a chat completion and return the message content.
+
+        When ``on_delta`` is given the completion is streamed and every content
+        delta is awaited through it as it arrives.
+        """
+        async with self.slot(cog_name):
+            if on_delta is None:
+                completion = await self.client.chat.completions.create(**params)
+                return completion.choices[0].message.content
+
+            parts = []
+            stream = await self.client.chat.completions.create(stream=True, **params)
+            async for chunk in stream:
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content
+                if delta:
+                    parts.append(delta)
+                    await on_delta(delta)
+            return "".join(parts)
+
+    async def aclose(self) -> None:
+        """Close the pooled HTTP connections."""
+        await self.client.close()
+        await self._http.aclose()
+
+
+_service: Optional[GroqService] = None
+
+
+def acquire_groq(cog_name: str, concurrency: int = DEFAULT_COG_CONCURRENCY) -> GroqService:
+    """Return the process-wide GroqService, creating it on first use."""
+    global _service
+    if _service is None:
+        _service = GroqService()
+        log.info("Created shared Groq client")
+    _service.register(cog_name, concurrency)
+    return _service
+
+
+async def release_groq(cog_name: str) -> None:
+    """Drop a cog's registration and close the client once the last cog is gone."""
+    global _service
+    if _service is None:
+        return
+    if _service.unregister(cog_name):
+        service, _service = _service, None
+        await service.aclose()
+        log.info("Closed shared Groq client")
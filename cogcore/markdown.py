@@ -0,0 +1,105 @@
+import math
+import re
+from typing import List, Optional, Tuple
+
+EMBED_DESCRIPTION_LIMIT: int = 4096  # Discord's hard limit for an embed description
+MESSAGE_EMBED_LIMIT: int = 6000  # Discord's limit on all embed text in one message
+MAX_EMBEDS_PER_MESSAGE: int = 10
+
+_FENCE_LINE = re.compile(r"^ {0,3}(`{3,}|~{3,})(.*)$")
+
+
+def open_fence(text: str) -> Optional[Tuple[str, str]]:
+    """The ``(marker, opening line)`` of a code fence left open at the end of ``text``."""
+    fence = None
+    for line in text.split("\n"):
+        match = _FENCE_LINE.match(line)
+        if match is None:
+            continue
+        marker = match.group(1)
+        if fence is None:
+            fence = (marker, line.strip())
+        elif (
+            marker[0] == fence[0][0]
+            and len(marker) >= len(fence[0])
+            and not match.group(2).strip()
+        ):
+            fence = None
+    return fence
+
+
+def _cut(text: str, limit: int) -> int:
+    """Where to end a page of at most ``limit`` characters.
+
+    Paragraph breaks win over line breaks, which win over spaces, as long as
+    the page stays at least half full; otherwise the text is cut mid-word.
+    """
+    for separator in ("\n\n", "\n", " "):
+        cut = text.rfind(separator, 0, limit)
+        if cut >= limit // 2:
+            return cut
+    return limit
+
+
+def split_markdown(text: str, limit: int = EMBED_DESCRIPTION_LIMIT) -> List[str]:
+    """Split text into pages of at most ``limit`` characters without breaking markdown.
+
+    Pages end on paragraph, line or word boundaries where possible. A code
+    block cut by a page boundary is closed at the end of that page and opened
+    again, with the same language, at the start of the next one.
+    """
+    pages = []
+    text = text.strip("\n")
+    while len(text) > limit:
+        reserve = 0
+        while True:
+            cut = _cut(text, limit - reserve)
+            page = text[:cut].rstrip()
+            fence = open_fence(page)
+            closing = "\n" + fence[0] if fence else ""
+            if len(page) + len(closing) <= limit or reserve:
+                break
+            reserve = len(closing)
+        rest = text[cut:].lstrip("\n" if text[cut : cut + 1] == "\n" else " ")
+        if fence:
+            page += closing
+            rest = fence[1] + "\n" + rest
+        pages.append(page)
+        text = rest
+    if text:
+        pages.append(text)
+    return pages
+
+
+def paginate(
+    text: str,
+    page_limit: int = EMBED_DESCRIPTION_LIMIT,
+    overhead: int = 0,
+    message_limit: int = MESSAGE_EMBED_LIMIT,
+    max_embeds: int = MAX_EMBEDS_PER_MESSAGE,
+) -> List[List[str]]:
+    """Split text into messages, each a list of embed descriptions.
+
+    Every embed holds at most ``page_limit`` characters, and the embeds of one
+    message, each carrying ``overhead`` characters of title and footer, stay
+    within Discord's per-message limits. Packing several embeds into a message
+    takes a fraction of the API calls one message per page would.
+    """
+    per_message = min(max_embeds, math.ceil(message_limit / page_limit) + 1)
+    budget = message_limit - per_message * overhead
+
+    messages: List[List[str]] = []
+    for chunk in split_markdown(text, budget):
+        messages.append([])
+        used = 0
+        for page in split_markdown(chunk, page_limit):
+            # Reopened code fences can push a chunk slightly past its budget
+            size = len(page) + overhead
+            if messages[-1] and (
+                used + size > message_limit or len(messages[-1]) == max_embeds
+            ):
+                messages.append([])
+                used = 0
+            messages[-1].append(page)
+            used += size
+    return messages
@@ -0,0 +1,152 @@
+import asyncio
+import heapq
+import time
+from collections import deque
+from typing import Awaitable, Callable, Deque, Dict, Hashable, List, Optional, Tuple
+
+
+class QueueFull(Exception):
+    """Raised when a request arrives while the scheduler's queue is at capacity."""
+
+
+class FairScheduler:
+    """A fixed number of worker slots handed out round-robin across users.
+
+    Requests beyond the free slots wait in one queue per user, and a freed slot
+    goes to the next user in turn rather than to the oldest request, so one
+    user queueing several requests can't starve everyone else. Every operation
+    is O(1) except reporting a queue position, which walks the waiting users.
+    """
+
+    def __init__(self, workers: int, max_waiting: int):
+        self.workers = workers
+        self.max_waiting = max_waiting
+        self._running = 0
+        self._waiting: Dict[Hashable, Deque[asyncio.Future]] = {}
+        # Users with waiting requests, in turn order
+        self._turns: Deque[Hashable] = deque()
+        self._size = 0
+
+    @property
+    def running(self) -> int:
+        return self._running
+
+    @property
+    def waiting(self) -> int:
+        return self._size
+
+    def position(self, user_id: Hashable) -> int:
+        """Place in line a new request from ``user_id`` would get, 1 being next."""
+        rounds = len(self._waiting.get(user_id, ())) + 1
+        ahead = rounds - 1
+        before = True  # Users before ``user_id`` in turn order get one more round
+        for other in self._turns:
+            if other == user_id:
+                before = False
+                continue
+            ahead += min(len(self._waiting[other]), rounds if before else rounds - 1)
+        return ahead + 1
+
+    async def acquire(
+        self,
+        user_id: Hashable,
+        on_queued: Optional[Callable[[int], Awaitable[None]]] = None,
+    ) -> None:
+        """Wait for a worker slot, calling ``on_queued`` with the queue position first.
+
+        Raises ``QueueFull`` without waiting when ``max_waiting`` requests are
+        already queued.
+        """
+        if self._running < self.workers and not self._turns:
+            self._running += 1
+            return
+        if self._size >= self.max_waiting:
+            raise QueueFull()
+
+        position = self.position(user_id)
+        future = asyncio.get_running_loop().create_future()
+        queue = self._waiting.get(user_id)
+        if queue is None:
+            queue = self._waiting[user_id] = deque()
+            self._turns.append(user_id)
+        queue.append(future)
+        self._size += 1
+        try:
+            if on_queued is not None:
+                await on_queued(position)
+            await future
+        except BaseException:
+            if future.done() and not future.cancelled():
+                # The slot was already handed over; pass it on
+                self.release()
+            else:
+                future.cancel()
+                self._forget(user_id, future)
+            raise
+
+    def release(self) -> None:
+        """Give a finished request's slot to the next user in turn."""
+        while self._turns:
+            user_id = self._turns.popleft()
+            queue = self._waiting[user_id]
+            future = queue.popleft()
+            self._size -= 1
+            if queue:
+                self._turns.append(user_id)
+            else:
+                del self._waiting[user_id]
+            if not future.done():
+                future.set_result(None)
+                return
+        self._running -= 1
+
+    def _forget(self, user_id: Hashable, future: asyncio.Future) -> None:
+        queue = self._waiting.get(user_id)
+        if queue is None or future not in queue:
+            return
+        queue.remove(future)
+        self._size -= 1
+        if not queue:
+            del self._waiting[user_id]
+            self._turns.remove(user_id)
+
+
+class Cooldowns:
+    """Per-user cooldowns that forget users once their cooldown has run out.
+
+    Expiry times sit in a min-heap next to the lookup dict, so expired entries
+    are dropped as time passes and memory only holds users still cooling down.
+    """
+
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+        self._until: Dict[Hashable, float] = {}
+        self._heap: List[Tuple[float, Hashable]] = []
+
+    def __len__(self) -> int:
+        self._expire(time.monotonic())
+        return len(self._until)
+
+    def _expire(self, now: float) -> None:
+        while self._heap and self._heap[0][0] <= now:
+            until, key = heapq.heappop(self._heap)
+            # A restarted cooldown leaves its old heap entry behind
+            if self._until.get(key) == until:
+                del self._until[key]
+
+    def remaining(self, key: Hashable) -> float:
+        """Seconds left on ``key``'s cooldown, 0 when it can go ahead."""
+        now = time.monotonic()
+        self._expire(now)
+        until = self._until.get(key)
+        return until - now if until is not None else 0.0
+
+    def start(self, key: Hashable) -> None:
+        """Put ``key`` on cooldown from now."""
+        until = time.monotonic() + self.seconds
+        self._until[key] = until
+        heapq.heappush(self._heap, (until, key))
+
+    def cancel(self, key: Hashable) -> None:
+        """End ``key``'s cooldown early; its heap entry is dropped when it expires."""
+        self._until.pop(key, None)
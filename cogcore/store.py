@@ -0,0 +1,260 @@
+import asyncio
+import concurrent.futures
+import json
+import logging
+import pathlib
+import sqlite3
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Set
+
+from .tokens import Turn
+
+log = logging.getLogger("red.cogcore.store")
+
+MAX_HOT_CONVERSATIONS: int = 500  # Conversations kept in memory at once
+IDLE_TTL_SECONDS: float = 3600.0  # Conversations untouched this long leave memory
+FLUSH_INTERVAL_SECONDS: float = 5.0  # How often dirty conversations are written out
+
+
+class Conversation:
+    """A user's turns, plus the rolling summary of older ones, as held in the hot set."""
+
+    __slots__ = ("turns", "summary", "last_used")
+
+    def __init__(self, turns: List[Turn], summary: Optional[Turn] = None):
+        self.turns = turns
+        self.summary = summary
+        self.last_used = time.monotonic()
+
+    @property
+    def tokens(self) -> int:
+        """Tokens used by the summary and every turn."""
+        total = sum(turn.tokens for turn in self.turns)
+        return total + self.summary.tokens if self.summary else total
+
+
+class HistoryStore:
+    """Conversation store with an LRU/TTL in-memory tier over an optional SQLite file.
+
+    Reads fall through to SQLite when a conversation isn't hot. Writes only mark
+    the conversation dirty; a background task writes dirty conversations in one
+    transaction every ``flush_interval`` seconds. All SQLite work runs on a
+    single dedicated thread. With ``path=None`` the store is memory-only.
+    """
+
+    def __init__(
+        self,
+        path: Optional[pathlib.Path] = None,
+        max_hot: int = MAX_HOT_CONVERSATIONS,
+        idle_ttl: float = IDLE_TTL_SECONDS,
+        flush_interval: float = FLUSH_INTERVAL_SECONDS,
+    ):
+        self.path = path
+        self.max_hot = max_hot
+        self.idle_ttl = idle_ttl
+        self.flush_interval = flush_interval
+        self._hot: "OrderedDict[str, Conversation]" = OrderedDict()
+        self._dirty: Set[str] = set()
+        self._pending: Dict[str, Optional[str]] = {}  # Serialized rows, None = delete
+        self._db: Optional[sqlite3.Connection] = None
+        self._executor: Optional[concurrent.futures.ThreadPoolExecutor] = None
+        self._flush_task: Optional[asyncio.Task] = None
+        if path is not None:
+            self._executor = concurrent.futures.ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix="historystore"
+            )
+
+    def start(self) -> None:
+        """Start the background flush task."""
+        if self._flush_task is None:
+            self._flush_task = asyncio.get_running_loop().create_task(
+                self._flush_loop()
+            )
+
+    async def close(self) -> None:
+        """Stop the flush task, write everything pending and close the database."""
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            self._flush_task = None
+        await self.flush()
+        if self._executor is not None:
+            await self._run(self._close_db)
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    async def load(self, key: Any) -> Conversation:
+        """Return the live conversation for ``key``, loading it from disk if needed."""
+        key = str(key)
+        conversation = self._hot.get(key)
+        if conversation is None:
+            loaded = await self._read(key)
+            # Another caller may have loaded it while we were waiting on the thread
+            conversation = self._hot.get(key)
+            if conversation is None:
+                conversation = loaded
+                self._hot[key] = conversation
+                self._evict_overflow()
+        self._hot.move_to_end(key)
+        conversation.last_used = time.monotonic()
+        return conversation
+
+    def mark_dirty(self, key: Any) -> None:
+        """Schedule ``key`` to be written on the next flush."""
+        self._dirty.add(str(key))
+
+    async def delete(self, key: Any) -> bool:
+        """Forget one conversation; returns False if there was none."""
+        key = str(key)
+        conversation = await self.load(key)
+        existed = bool(conversation.turns or conversation.summary)
+        self._hot.pop(key, None)
+        self._dirty.discard(key)
+        self._pending[key] = None
+        return existed
+
+    async def clear(self) -> None:
+        """Forget every conversation, in memory and on disk."""
+        self._hot.clear()
+        self._dirty.clear()
+        self._pending.clear()
+        if self._executor is not None:
+            await self._run(self._clear_db)
+
+    async def flush(self) -> None:
+        """Write dirty conversations and evict idle ones."""
+        for key in self._dirty:
+            conversation = self._hot.get(key)
+            if conversation is not None:
+                self._pending[key] = self._serialize(conversation)
+        self._dirty.clear()
+        self._evict_idle()
+
+        if not self._pending:
+            return
+        batch, self._pending = self._pending, {}
+        if self._executor is None:
+            return
+        try:
+            await self._run(self._write_batch, batch)
+        except Exception as e:
+            log.error(f"Failed to write conversation batch: {e}", exc_info=True)
+            # Keep the rows so the next flush retries them, without overwriting newer ones
+            self._pending = {**batch, **self._pending}
+
+    async def _flush_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except Exception as e:
+                log.error(f"Error in history flush task: {e}", exc_info=True)
+
+    def _evict_overflow(self) -> None:
+        while len(self._hot) > self.max_hot:
+            key, conversation = self._hot.popitem(last=False)
+            self._stash(key, conversation)
+
+    def _evict_idle(self) -> None:
+        cutoff = time.monotonic() - self.idle_ttl
+        while self._hot:
+            key, conversation = next(iter(self._hot.items()))
+            if conversation.last_used > cutoff:
+                break
+            del self._hot[key]
+            self._stash(key, conversation)
+
+    def _stash(self, key: str, conversation: Conversation) -> None:
+        """Move an evicted dirty conversation into the pending write batch."""
+        if key in self._dirty:
+            self._dirty.discard(key)
+            self._pending[key] = self._serialize(conversation)
+
+    @staticmethod
+    def _serialize(conversation: Conversation) -> str:
+        summary = conversation.summary
+        return json.dumps(
+            {
+                "turns": [
+                    [turn.role, turn.content, turn.tokens]
+                    for turn in conversation.turns
+                ],
+                "summary": [summary.content, summary.tokens] if summary else None,
+            }
+        )
+
+    @staticmethod
+    def _deserialize(payload: str) -> Conversation:
+        data = json.loads(payload)
+        summary = data.get("summary")
+        return Conversation(
+            [Turn(role, content, tokens) for role, content, tokens in data["turns"]],
+            Turn("system", *summary) if summary else None,
+        )
+
+    async def _read(self, key: str) -> Conversation:
+        # A pending row is newer than whatever is on disk
+        if key in self._pending:
+            payload = self._pending[key]
+        elif self._executor is None:
+            payload = None
+        else:
+            payload = await self._run(self._read_row, key)
+        return self._deserialize(payload) if payload else Conversation([])
+
+    async def _run(self, func, *args):
+        return await asyncio.get_running_loop().run_in_executor(
+            self._executor, func, *args
+        )
+
+    # The methods below only ever run on the store's single worker thread
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._db is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(self.path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS conversations ("
+                "key TEXT PRIMARY KEY, payload TEXT NOT NULL, updated_at REAL NOT NULL)"
+            )
+            self._db.commit()
+        return self._db
+
+    def _read_row(self, key: str) -> Optional[str]:
+        row = (
+            self._connect()
+            .execute("SELECT payload FROM conversations WHERE key = ?", (key,))
+            .fetchone()
+        )
+        return row[0] if row else None
+
+    def _write_batch(self, batch: Dict[str, Optional[str]]) -> None:
+        db = self._connect()
+        now = time.time()
+        with db:
+            db.executemany(
+                "DELETE FROM conversations WHERE key = ?",
+                [(key,) for key, payload in batch.items() if payload is None],
+            )
+            db.executemany(
+                "INSERT INTO conversations (key, payload, updated_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET payload = excluded.payload, "
+                "updated_at = excluded.updated_at",
+                [
+                    (key, payload, now)
+                    for key, payload in batch.items()
+                    if payload is not None
+                ],
+            )
+
+    def _clear_db(self) -> None:
+        db = self._connect()
+        with db:
+            db.execute("DELETE FROM conversations")
+
+    def _close_db(self) -> None:
+        if self._db is not None:
+            self._db.close()
+            self._db = None
@@ -0,0 +1,118 @@
+import asyncio
+import io
+import logging
+from typing import Awaitable, Callable, List, Optional
+
+import discord
+
+from .markdown import EMBED_DESCRIPTION_LIMIT, paginate
+
+log = logging.getLogger("red.cogcore.streaming")
+
+# Keeps each message well inside Discord's 5 edits / 5 s budget
+EDIT_INTERVAL_SECONDS: float = 1.5
+
+
+class EmbedStreamer:
+    """Render a streamed completion into one or more progressively edited embeds.
+
+    Deltas are buffered and flushed at most once per ``interval``. Text that
+    overflows one embed is split on markdown boundaries into further embeds,
+    packed several to a message, unless ``tail`` is set, in which case a
+    single embed previews the most recent ``limit`` characters.
+    """
+
+    def __init__(
+        self,
+        send: Callable[..., Awaitable[discord.Message]],
+        make_embed: Callable[[str], discord.Embed],
+        *,
+        first_message: Optional[discord.Message] = None,
+        transform: Optional[Callable[[str], str]] = None,
+        interval: float = EDIT_INTERVAL_SECONDS,
+        limit: int = EMBED_DESCRIPTION_LIMIT,
+        tail: bool = False,
+    ):
+        self.send = send
+        self.make_embed = make_embed
+        self.transform = transform
+        self.interval = interval
+        self.limit = limit
+        self.tail = tail
+        self.messages: List[discord.Message] = [first_message] if first_message else []
+        self._rendered: List[Optional[List[str]]] = [None] * len(self.messages)
+        self._parts: List[str] = []
+        self._last_flush = 0.0
+        self._overhead: Optional[int] = None  # Title and footer length of one embed
+
+    @property
+    def text(self) -> str:
+        """Everything received so far."""
+        return "".join(self._parts)
+
+    async def feed(self, delta: str) -> None:
+        """Buffer a delta and flush if the edit interval has passed."""
+        self._parts.append(delta)
+        now = asyncio.get_running_loop().time()
+        if now - self._last_flush >= self.interval:
+            self._last_flush = now
+            await self._flush(self.text)
+
+    async def finish(self, final_text: Optional[str] = None) -> str:
+        """Flush the final text, optionally replacing what was streamed, and return it."""
+        text = self.text if final_text is None else final_text
+        count = await self._flush(text)
+        if count is not None:
+            # A final text shorter than the stream leaves overflow messages behind
+            for message in self.messages[count:]:
+                try:
+                    await message.delete()
+                except discord.HTTPException as e:
+                    log.warning(f"Failed to delete streamed message: {e}")
+            del self.messages[count:]
+            del self._rendered[count:]
+        return text
+
+    async def attach_image(self, data: bytes, filename: str = "image.png") -> None:
+        """Show an in-memory image at the bottom of the last rendered embed."""
+        if not self.messages or self._rendered[-1] is None:
+            return
+        embeds = [self.make_embed(page) for page in self._rendered[-1]]
+        embeds[-1].set_image(url=f"attachment://{filename}")
+        try:
+            await self.messages[-1].edit(
+                embeds=embeds,
+                attachments=[discord.File(io.BytesIO(data), filename=filename)],
+            )
+        except discord.HTTPException as e:
+            log.warning(f"Failed to attach image to streamed message: {e}")
+
+    async def _flush(self, text: str) -> Optional[int]:
+        """Render ``text``, returning how many messages it took, or None on failure."""
+        if self.transform:
+            text = self.transform(text)
+        if not text:
+            return None
+
+        if self.tail:
+            messages = [[text[-self.limit :]]]
+        else:
+            if self._overhead is None:
+                self._overhead = len(self.make_embed(""))
+            messages = paginate(text, self.limit, self._overhead)
+
+        for index, pages in enumerate(messages):
+            try:
+                if index >= len(self.messages):
+                    embeds = [self.make_embed(page) for page in pages]
+                    self.messages.append(await self.send(embeds=embeds))
+                    self._rendered.append(pages)
+                elif self._rendered[index] != pages:
+                    await self.messages[index].edit(
+                        content=None, embeds=[self.make_embed(page) for page in pages]
+                    )
+                    self._rendered[index] = pages
+            except discord.HTTPException as e:
+                log.warning(f"Failed to update streamed message: {e}")
+                return None
+        return len(messages)
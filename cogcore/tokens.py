@@ -0,0 +1,49 @@
+import logging
+from typing import Dict, Optional
+
+log = logging.getLogger("red.cogcore.tokens")
+
+# Fall back to a character heuristic when tiktoken isn't usable
+try:
+    import tiktoken
+except ImportError:
+    _ENCODING = None
+else:
+    try:
+        # Downloaded on first use, so an offline host fails here
+        _ENCODING = tiktoken.get_encoding("cl100k_base")
+    except Exception as e:
+        log.warning(f"tiktoken encoding unavailable, estimating tokens instead: {e}")
+        _ENCODING = None
+
+# Rough average for English text when no tokenizer is available
+CHARS_PER_TOKEN: int = 4
+MESSAGE_OVERHEAD_TOKENS: int = 4  # Role and framing tokens the API adds per message
+
+
+def count_tokens(text: str) -> int:
+    """Count the tokens in ``text``, using tiktoken when available."""
+    if not text:
+        return 0
+    if _ENCODING is not None:
+        return len(_ENCODING.encode(text, disallowed_special=()))
+    return -(-len(text) // CHARS_PER_TOKEN)
+
+
+class Turn:
+    """A single conversation message with its token count computed once."""
+
+    __slots__ = ("role", "content", "tokens")
+
+    def __init__(self, role: str, content: str, tokens: Optional[int] = None):
+        self.role = role
+        self.content = content
+        self.tokens = (
+            tokens
+            if tokens is not None
+            else count_tokens(content) + MESSAGE_OVERHEAD_TOKENS
+        )
+
+    def as_message(self) -> Dict[str, str]:
+        """Return the turn in the shape the chat completions API expects."""
+        return {"role": self.role, "content": self.content}
@@ -1,5 +1,5 @@
-from .dc import dc
-
-
-async def setup(bot):
-    await bot.add_cog(dc(bot))
+from .dc import dc
+
+
+async def setup(bot):
+    await bot.add_cog(dc(bot))
@@ -1,5 +1,5 @@
-from .jailuser import JailUser
-
-
-async def setup(bot):
-    await bot.add_cog(JailUser(bot))
+from .jailuser import JailUser
+
+
+async def setup(bot):
+    await bot.add_cog(JailUser(bot))
@@ -1,5 +1,5 @@
-from .marketadvice import MarketAdvice
-
-
-async def setup(bot):
-    await bot.add_cog(MarketAdvice(bot))
+from .marketadvice import MarketAdvice
+
+
+async def setup(bot):
+    await bot.add_cog(MarketAdvice(bot))
@@ -0,0 +1,310 @@
+import bisect
+import itertools
+import math
+import re
+import threading
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import pandas as pd
+
+from . import indicators
+
+RSI_PERIOD: int = 14
+UP, DOWN = "above", "below"
+
+_CONDITION = re.compile(
+    r"^(?:(?P<subject>price|close|rsi)\s+)?"
+    r"(?P<direction>crosses\s+above|crosses\s+below|crosses|cross|above|below)\s+"
+    r"(?P<target>\S+)$",
+    re.IGNORECASE,
+)
+_EMA = re.compile(r"^(?:ema(\d+)|(\d+)ema)$", re.IGNORECASE)
+
+
+class Alert:
+    """One user's one-shot alert on a symbol and timeframe."""
+
+    __slots__ = (
+        "id",
+        "user_id",
+        "channel_id",
+        "symbol",
+        "timeframe",
+        "metric",
+        "directions",
+        "level",
+        "description",
+    )
+
+    def __init__(
+        self,
+        id: int,
+        user_id: int,
+        channel_id: int,
+        symbol: str,
+        timeframe: str,
+        metric: str,
+        directions: Tuple[str, ...],
+        level: float,
+        description: str,
+    ):
+        self.id = id
+        self.user_id = user_id
+        self.channel_id = channel_id
+        self.symbol = symbol
+        self.timeframe = timeframe
+        self.metric = metric  # "price", "rsi" or "emaN" (close minus the EMA)
+        self.directions = directions  # Crossing directions that fire the alert
+        self.level = level
+        self.description = description
+
+    @property
+    def key(self) -> Tuple[str, str]:
+        return self.symbol, self.timeframe
+
+    def to_dict(self) -> Dict[str, object]:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, object]) -> "Alert":
+        data = dict(data)
+        data["directions"] = tuple(data["directions"])
+        return cls(**data)
+
+
+def parse_condition(text: str) -> Tuple[str, Tuple[str, ...], float, str]:
+    """Parse ``crosses ema20``, ``rsi below 30`` or ``price above 100``.
+
+    Returns ``(metric, directions, level, description)``; raises ValueError
+    with a message fit to show the user.
+    """
+    match = _CONDITION.match(" ".join(text.split()))
+    if not match:
+        raise ValueError(
+            "Conditions look like `crosses ema20`, `above ema50`, `rsi below 30` "
+            "or `price above 100`."
+        )
+    subject = (match["subject"] or "price").lower()
+    direction = match["direction"].lower().split()[-1]
+    directions = (UP, DOWN) if direction.startswith("cross") else (direction,)
+    verb = "crosses" if len(directions) == 2 else f"crosses {direction}"
+
+    ema_match = _EMA.match(match["target"])
+    if ema_match:
+        if subject == "rsi":
+            raise ValueError("RSI can only be compared with a number.")
+        span = int(ema_match[1] or ema_match[2])
+        if not 2 <= span <= 500:
+            raise ValueError("EMA length must be between 2 and 500.")
+        return f"ema{span}", directions, 0.0, f"price {verb} EMA{span}"
+
+    try:
+        level = float(match["target"])
+    except ValueError:
+        raise ValueError(f"`{match['target']}` is not a number or EMA.") from None
+    metric = "rsi" if subject == "rsi" else "price"
+    return metric, directions, level, f"{metric} {verb} {indicators.fmt(level)}"
+
+
+class IndicatorState:
+    """Latest close, EMAs and Wilder RSI averages, advanced one candle at a time."""
+
+    __slots__ = ("last_time", "close", "emas", "avg_gain", "avg_loss")
+
+    def __init__(self):
+        self.last_time: Optional[pd.Timestamp] = None
+        self.close = float("nan")
+        self.emas: Dict[int, float] = {}
+        self.avg_gain = float("nan")
+        self.avg_loss = float("nan")
+
+    def seed(self, close: pd.Series) -> None:
+        """Start from the vectorized indicators over a history of closes."""
+        self.last_time = close.index[-1]
+        self.close = float(close.iloc[-1])
+        delta = close.diff()
+        alpha = 1 / RSI_PERIOD
+        self.avg_gain = float(
+            delta.clip(lower=0).ewm(alpha=alpha, adjust=False).mean().iloc[-1]
+        )
+        self.avg_loss = float(
+            (-delta.clip(upper=0)).ewm(alpha=alpha, adjust=False).mean().iloc[-1]
+        )
+        for span in self.emas:
+            self.emas[span] = float(indicators.ema(close, span).iloc[-1])
+
+    def seed_ema(self, close: pd.Series, span: int) -> None:
+        """Add an EMA that wasn't being tracked yet."""
+        history = close.loc[: self.last_time]
+        self.emas[span] = float(indicators.ema(history, span).iloc[-1])
+
+    def update(self, time: pd.Timestamp, close: float) -> None:
+        """Advance every indicator by one closed candle in O(1)."""
+        delta = close - self.close
+        self.avg_gain += (max(delta, 0.0) - self.avg_gain) / RSI_PERIOD
+        self.avg_loss += (max(-delta, 0.0) - self.avg_loss) / RSI_PERIOD
+        for span, value in self.emas.items():
+            self.emas[span] = value + 2 / (span + 1) * (close - value)
+        self.close = close
+        self.last_time = time
+
+    @property
+    def rsi(self) -> float:
+        if self.avg_loss == 0:
+            return 100.0
+        return 100 - 100 / (1 + self.avg_gain / self.avg_loss)
+
+    def value(self, metric: str) -> float:
+        if metric == "price":
+            return self.close
+        if metric == "rsi":
+            return self.rsi
+        return self.close - self.emas[int(metric[3:])]
+
+
+class _KeyAlerts:
+    """Alerts on one symbol and timeframe, indexed by metric, direction and level."""
+
+    __slots__ = ("state", "levels", "alerts")
+
+    def __init__(self):
+        self.state = IndicatorState()
+        # (metric, direction) -> [(level, alert id)] kept sorted for bisecting
+        self.levels: Dict[Tuple[str, str], List[Tuple[float, int]]] = {}
+        self.alerts: Dict[int, Alert] = {}
+
+    def add(self, alert: Alert) -> None:
+        self.alerts[alert.id] = alert
+        for direction in alert.directions:
+            entries = self.levels.setdefault((alert.metric, direction), [])
+            bisect.insort(entries, (alert.level, alert.id))
+
+    def remove(self, alert: Alert) -> None:
+        self.alerts.pop(alert.id, None)
+        for direction in alert.directions:
+            entries = self.levels.get((alert.metric, direction), [])
+            i = bisect.bisect_left(entries, (alert.level, alert.id))
+            if i < len(entries) and entries[i] == (alert.level, alert.id):
+                del entries[i]
+            if not entries:
+                self.levels.pop((alert.metric, direction), None)
+
+    def spans(self) -> Set[int]:
+        return {int(metric[3:]) for metric, _ in self.levels if metric[:3] == "ema"}
+
+    def crossed(self, before: Dict[str, float], after: Dict[str, float]) -> Set[int]:
+        """Ids of alerts whose level was crossed between two candles."""
+        fired: Set[int] = set()
+        for (metric, direction), entries in self.levels.items():
+            old, new = before[metric], after[metric]
+            if math.isnan(old) or math.isnan(new):
+                continue
+            if direction == UP:
+                # old <= level < new
+                lo = bisect.bisect_left(entries, (old,))
+                hi = bisect.bisect_left(entries, (new,))
+            else:
+                # new < level <= old
+                lo = bisect.bisect_right(entries, (new, float("inf")))
+                hi = bisect.bisect_right(entries, (old, float("inf")))
+            fired.update(alert_id for _, alert_id in entries[lo:hi])
+        return fired
+
+
+class AlertBook:
+    """Every alert, indexed by (symbol, timeframe), plus the indicator state for each.
+
+    ``process`` is called once per poll with the candles of one key. Its cost
+    grows with the number of new candles and the number of alerts that
+    actually fire, not with the number of alerts on the key. Thread-safe, so
+    processing can run on the market data pool while commands edit alerts.
+    """
+
+    def __init__(self, alerts: Iterable[Alert] = ()):
+        self._keys: Dict[Tuple[str, str], _KeyAlerts] = {}
+        self._lock = threading.Lock()
+        last_id = 0
+        for alert in alerts:
+            self._add(alert)
+            last_id = max(last_id, alert.id)
+        self._ids = itertools.count(last_id + 1)
+
+    def new_id(self) -> int:
+        with self._lock:
+            return next(self._ids)
+
+    def add(self, alert: Alert) -> None:
+        with self._lock:
+            self._add(alert)
+
+    def _add(self, alert: Alert) -> None:
+        self._keys.setdefault(alert.key, _KeyAlerts()).add(alert)
+
+    def remove(self, alert_id: int, user_id: Optional[int] = None) -> Optional[Alert]:
+        """Remove an alert, only if it belongs to ``user_id`` when one is given."""
+        with self._lock:
+            for key, entry in self._keys.items():
+                alert = entry.alerts.get(alert_id)
+                if alert is not None and user_id in (None, alert.user_id):
+                    self._remove(key, entry, alert)
+                    return alert
+            return None
+
+    def _remove(self, key: Tuple[str, str], entry: _KeyAlerts, alert: Alert) -> None:
+        entry.remove(alert)
+        if not entry.alerts:
+            del self._keys[key]
+
+    def all(self) -> List[Alert]:
+        with self._lock:
+            return [a for entry in self._keys.values() for a in entry.alerts.values()]
+
+    def for_user(self, user_id: int) -> List[Alert]:
+        return [alert for alert in self.all() if alert.user_id == user_id]
+
+    def symbols_by_timeframe(self) -> Dict[str, List[str]]:
+        """Distinct symbols to poll, grouped so each timeframe is one batch."""
+        grouped: Dict[str, List[str]] = {}
+        with self._lock:
+            for symbol, timeframe in self._keys:
+                grouped.setdefault(timeframe, []).append(symbol)
+        return grouped
+
+    def process(
+        self, key: Tuple[str, str], frame: pd.DataFrame, closed_before: pd.Timestamp
+    ) -> List[Tuple[Alert, float]]:
+        """Advance ``key`` over its newly closed candles; returns fired alerts and prices.
+
+        Only candles that opened before ``closed_before`` are used. The first
+        call for a key only seeds its indicators, so history never fires alerts.
+        """
+        with self._lock:
+            entry = self._keys.get(key)
+            if entry is None or frame.empty:
+                return []
+            close = frame["Close"][frame.index < closed_before]
+            if close.empty:
+                return []
+
+            state = entry.state
+            if state.last_time is None:
+                state.emas = dict.fromkeys(entry.spans(), 0.0)
+                state.seed(close)
+                return []
+            for span in entry.spans() - set(state.emas):
+                state.seed_ema(close, span)
+
+            fired: List[Tuple[Alert, float]] = []
+            for time, price in close[close.index > state.last_time].items():
+                metrics = [metric for metric, _ in entry.levels]
+                before = {metric: state.value(metric) for metric in metrics}
+                state.update(time, float(price))
+                after = {metric: state.value(metric) for metric in metrics}
+                for alert_id in entry.crossed(before, after):
+                    alert = entry.alerts[alert_id]
+                    fired.append((alert, float(price)))
+                    entry.remove(alert)
+                if not entry.alerts:
+                    del self._keys[key]
+                    break
+            return fired
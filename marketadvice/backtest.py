@@ -0,0 +1,132 @@
+from typing import Callable, Dict, Tuple
+
+import numpy as np
+import pandas as pd
+
+from . import indicators
+
+STOP_ATR_MULTIPLE: float = 2.0  # Stop loss distance below the entry, in ATRs
+FEE_BPS: float = 10.0  # Cost per side, in basis points
+
+Signals = Tuple[pd.Series, pd.Series]
+
+
+def _ema_cross(close: pd.Series, high: pd.Series, low: pd.Series) -> Signals:
+    fast, slow = indicators.ema(close, 9), indicators.ema(close, 21)
+    return fast > slow, fast < slow
+
+
+def _macd(close: pd.Series, high: pd.Series, low: pd.Series) -> Signals:
+    line = indicators.ema(close, 12) - indicators.ema(close, 26)
+    signal = indicators.ema(line, 9)
+    return line > signal, line < signal
+
+
+def _rsi(close: pd.Series, high: pd.Series, low: pd.Series) -> Signals:
+    value = indicators.rsi(close)
+    return value < 30, value > 70
+
+
+def _bollinger(close: pd.Series, high: pd.Series, low: pd.Series) -> Signals:
+    bands = indicators.bollinger(close)
+    return close < bands["lower"], close > bands["mid"]
+
+
+def _trend(close: pd.Series, high: pd.Series, low: pd.Series) -> Signals:
+    average = indicators.ema(close, 50)
+    return (close > average) & (indicators.rsi(close) > 50), close < average
+
+
+# Name -> (entry/exit signal builder, description shown to users)
+STRATEGIES: Dict[str, Tuple[Callable[..., Signals], str]] = {
+    "ema_cross": (_ema_cross, "Long while EMA9 is above EMA21"),
+    "macd": (_macd, "Long while the MACD line is above its signal line"),
+    "rsi": (_rsi, "Buy when RSI(14) drops below 30, sell above 70"),
+    "bollinger": (_bollinger, "Buy below the lower band, sell above the middle"),
+    "trend": (_trend, "Long above EMA50 with RSI over 50, out below EMA50"),
+}
+
+
+def run(
+    strategy: str,
+    open_: np.ndarray,
+    high: np.ndarray,
+    low: np.ndarray,
+    close: np.ndarray,
+    bars_per_year: float,
+    stop_atr: float = STOP_ATR_MULTIPLE,
+    fee_bps: float = FEE_BPS,
+) -> Dict[str, float]:
+    """Backtest a long-only strategy over OHLC arrays without a per-bar loop.
+
+    A signal on a bar's close enters at the next bar's open and exits at the
+    close of the bar the exit signal fires on. Every trade carries a stop
+    ``stop_atr`` ATRs below its entry, filled at the stop or at a worse open.
+    Runs in the process pool, so it only takes and returns plain data.
+    """
+    n = len(close)
+    builder, _ = STRATEGIES[strategy]
+    close_s, high_s, low_s = pd.Series(close), pd.Series(high), pd.Series(low)
+    entries, exits = builder(close_s, high_s, low_s)
+    atr = indicators.atr(high_s, low_s, close_s).to_numpy()
+
+    # Desired position after each bar's close: set by entries, cleared by exits
+    state = np.full(n, np.nan)
+    state[exits.to_numpy()] = 0.0
+    state[entries.to_numpy()] = 1.0
+    wanted = pd.Series(state).ffill().fillna(0.0).to_numpy()
+    held = np.concatenate([[0.0], wanted[:-1]]) == 1.0  # Position during each bar
+
+    index = np.arange(n)
+    start = held & ~np.concatenate([[False], held[:-1]])
+    trade = np.cumsum(start) * held  # Trade number per bar, 0 when flat
+    entry_bar = np.maximum.accumulate(np.where(start, index, 0))
+    entry_price = open_[entry_bar]
+    stop = entry_price - stop_atr * atr[np.maximum(entry_bar - 1, 0)]
+
+    # Bars after the first stop hit in a trade are flat
+    hit = held & (low <= stop)
+    hits_so_far = pd.Series(hit).groupby(trade).cumsum().to_numpy()
+    active = held & (hits_so_far - hit == 0)
+    stopped = hit & active
+    fill = np.minimum(stop, open_)
+
+    prev_close = np.concatenate([[np.nan], close[:-1]])
+    bar_open = np.where(start, entry_price, prev_close)
+    bar_close = np.where(stopped, fill, close)
+    returns = np.where(active, bar_close / bar_open - 1, 0.0)
+
+    next_active = np.concatenate([active[1:], [False]])
+    next_same = np.concatenate([trade[1:] == trade[:-1], [False]])
+    end = active & ~(next_active & next_same)
+    fee = fee_bps / 10_000
+    returns = returns - fee * start - fee * end
+
+    equity = np.cumprod(1 + returns)
+    drawdown = equity / np.maximum.accumulate(equity) - 1
+    trade_returns = (
+        pd.Series(1 + returns[active]).groupby(trade[active]).prod().to_numpy() - 1
+    )
+    wins = trade_returns[trade_returns > 0]
+    losses = trade_returns[trade_returns <= 0]
+    deviation = returns.std()
+
+    return {
+        "bars": float(n),
+        "total_return": float(equity[-1] - 1) * 100 if n else 0.0,
+        "buy_hold_return": float(close[-1] / close[0] - 1) * 100 if n else 0.0,
+        "max_drawdown": float(drawdown.min()) * 100 if n else 0.0,
+        "trades": float(len(trade_returns)),
+        "win_rate": len(wins) / len(trade_returns) * 100 if len(trade_returns) else 0.0,
+        "avg_trade": float(trade_returns.mean()) * 100 if len(trade_returns) else 0.0,
+        "profit_factor": (
+            float(wins.sum() / -losses.sum()) if losses.sum() < 0 else float("inf")
+        ),
+        "stops": float(stopped.sum()),
+        "exposure": float(active.mean()) * 100 if n else 0.0,
+        "sharpe": (
+            float(returns.mean() / deviation * np.sqrt(bars_per_year))
+            if deviation > 0
+            else 0.0
+        ),
+    }
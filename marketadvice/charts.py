@@ -0,0 +1,81 @@
+import importlib.util
+import io
+
+import numpy as np
+import pandas as pd
+
+from . import indicators
+
+CHART_CANDLES: int = 120  # Candles drawn on a chart
+CHART_WARMUP: int = 200  # Extra candles passed in so the averages are warmed up
+UP_COLOR = "#26a69a"
+DOWN_COLOR = "#ef5350"
+
+
+def available() -> bool:
+    """Whether matplotlib is installed; charts are skipped without it."""
+    return importlib.util.find_spec("matplotlib") is not None
+
+
+def render(
+    title: str,
+    times: np.ndarray,
+    open_: np.ndarray,
+    high: np.ndarray,
+    low: np.ndarray,
+    close: np.ndarray,
+) -> bytes:
+    """Draw a candlestick chart with EMAs, Bollinger bands and RSI as PNG bytes.
+
+    Runs in the chart process pool: matplotlib is only imported there, and the
+    image is rendered into a ``BytesIO`` buffer rather than a file.
+    """
+    from matplotlib.figure import Figure
+
+    close_s = pd.Series(close)
+    ema20 = indicators.ema(close_s, 20).to_numpy()
+    ema50 = indicators.ema(close_s, 50).to_numpy()
+    bands = indicators.bollinger(close_s)
+    rsi = indicators.rsi(close_s).to_numpy()
+
+    shown = slice(-CHART_CANDLES, None)
+    x = np.arange(len(close[shown]))
+    o, h, l, c = open_[shown], high[shown], low[shown], close[shown]
+    colors = np.where(c >= o, UP_COLOR, DOWN_COLOR)
+
+    fig = Figure(figsize=(10, 6), dpi=100)
+    price, oscillator = fig.subplots(
+        2, 1, sharex=True, gridspec_kw={"height_ratios": [3, 1]}
+    )
+    price.fill_between(
+        x,
+        bands["lower"].to_numpy()[shown],
+        bands["upper"].to_numpy()[shown],
+        color="#90a4ae",
+        alpha=0.15,
+        label="Bollinger(20,2)",
+    )
+    price.vlines(x, l, h, colors=colors, linewidth=0.8)
+    price.bar(x, np.abs(c - o), bottom=np.minimum(o, c), color=colors, width=0.7)
+    price.plot(x, ema20[shown], color="#ffa726", linewidth=1, label="EMA20")
+    price.plot(x, ema50[shown], color="#42a5f5", linewidth=1, label="EMA50")
+    price.set_title(title)
+    price.legend(loc="upper left", fontsize=8)
+    price.grid(alpha=0.2)
+
+    oscillator.plot(x, rsi[shown], color="#ab47bc", linewidth=1)
+    oscillator.axhline(70, color=DOWN_COLOR, linewidth=0.6, linestyle="--")
+    oscillator.axhline(30, color=UP_COLOR, linewidth=0.6, linestyle="--")
+    oscillator.set_ylim(0, 100)
+    oscillator.set_ylabel("RSI(14)")
+    oscillator.grid(alpha=0.2)
+
+    labels = pd.DatetimeIndex(times[shown]).strftime("%m-%d %H:%M")
+    ticks = np.linspace(0, len(x) - 1, num=min(8, len(x)), dtype=int)
+    oscillator.set_xticks(ticks)
+    oscillator.set_xticklabels(labels[ticks], fontsize=8)
+    fig.tight_layout()
+
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format="png")
+    return buffer.getvalue()
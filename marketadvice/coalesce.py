@@ -0,0 +1,71 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+
+class SingleFlight:
+    """Share one in-flight call, and its result for a short while, between identical requests.
+
+    Callers that ask for a key already being computed await the same task
+    instead of starting another one; callers that arrive after it finished get
+    the cached result until its TTL runs out. Exceptions are shared with every
+    waiter but never cached.
+    """
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+        # Key -> (expiry time, result), least recently used first
+        self._results: OrderedDict = OrderedDict()
+        self.hits = 0  # Served from the result cache
+        self.coalesced = 0  # Joined a call already in flight
+        self.misses = 0  # Started a new call
+
+    async def run(
+        self, key: Hashable, factory: Callable[[], Awaitable[Any]], ttl: float
+    ) -> Any:
+        """Return the result for ``key``, calling ``factory`` only if nobody else is."""
+        cached = self._results.get(key)
+        if cached is not None:
+            expires_at, value = cached
+            if expires_at > time.monotonic():
+                self.hits += 1
+                self._results.move_to_end(key)
+                return value
+            del self._results[key]
+
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            self.misses += 1
+            task = asyncio.get_running_loop().create_task(factory())
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._finish(key, t, ttl))
+
+        # Shield so one caller giving up doesn't cancel the call for everyone else
+        return await asyncio.shield(task)
+
+    def _finish(self, key: Hashable, task: asyncio.Task, ttl: float) -> None:
+        self._inflight.pop(key, None)
+        if task.cancelled() or task.exception() is not None or ttl <= 0:
+            return
+        self._results[key] = (time.monotonic() + ttl, task.result())
+        self._results.move_to_end(key)
+        while len(self._results) > self.max_entries:
+            self._results.popitem(last=False)
+
+    def stats(self) -> Dict[str, int]:
+        """Counters for the owner stats command."""
+        return {
+            "hits": self.hits,
+            "coalesced": self.coalesced,
+            "misses": self.misses,
+            "in_flight": len(self._inflight),
+            "cached": len(self._results),
+        }
+
+    def clear(self) -> None:
+        """Drop every cached result."""
+        self._results.clear()
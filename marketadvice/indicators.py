@@ -0,0 +1,283 @@
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+SUMMARY_ROWS: int = 24  # Candles kept in the downsampled table sent to the LLM
+PIVOT_WINDOW: int = 3  # Candles on each side a swing high/low must dominate
+MAX_LEVELS: int = 3  # Support and resistance levels reported on each side
+EMA_SPANS = (9, 21, 50, 200)
+SMA_WINDOWS = (20, 50)
+
+
+def ema(close: pd.Series, span: int) -> pd.Series:
+    """Exponential moving average."""
+    return close.ewm(span=span, adjust=False).mean()
+
+
+def sma(close: pd.Series, window: int) -> pd.Series:
+    """Simple moving average."""
+    return close.rolling(window).mean()
+
+
+def rsi(close: pd.Series, period: int = 14) -> pd.Series:
+    """Wilder's relative strength index."""
+    delta = close.diff()
+    gain = delta.clip(lower=0).ewm(alpha=1 / period, adjust=False).mean()
+    loss = (-delta.clip(upper=0)).ewm(alpha=1 / period, adjust=False).mean()
+    rs = gain / loss.replace(0, np.nan)
+    return (100 - 100 / (1 + rs)).fillna(100.0).where(loss.notna())
+
+
+def macd(
+    close: pd.Series, fast: int = 12, slow: int = 26, signal: int = 9
+) -> pd.DataFrame:
+    """MACD line, signal line and histogram."""
+    line = ema(close, fast) - ema(close, slow)
+    signal_line = ema(line, signal)
+    return pd.DataFrame(
+        {"macd": line, "signal": signal_line, "hist": line - signal_line}
+    )
+
+
+def atr(
+    high: pd.Series, low: pd.Series, close: pd.Series, period: int = 14
+) -> pd.Series:
+    """Wilder's average true range."""
+    prev_close = close.shift()
+    true_range = np.maximum(
+        np.maximum(high - low, (high - prev_close).abs()), (low - prev_close).abs()
+    )
+    return true_range.ewm(alpha=1 / period, adjust=False).mean()
+
+
+def bollinger(close: pd.Series, window: int = 20, k: float = 2.0) -> pd.DataFrame:
+    """Bollinger bands around a simple moving average."""
+    mid = sma(close, window)
+    std = close.rolling(window).std(ddof=0)
+    return pd.DataFrame({"mid": mid, "upper": mid + k * std, "lower": mid - k * std})
+
+
+def vwap(data: pd.DataFrame) -> pd.Series:
+    """Volume-weighted average price, reset every session for intraday data."""
+    typical = (data["High"] + data["Low"] + data["Close"]) / 3
+    weighted = typical * data["Volume"]
+    index = data.index
+    intraday = len(index) > 1 and (index[1:] - index[:-1]).min() < pd.Timedelta(days=1)
+    if intraday:
+        session = index.normalize()
+        cum_weighted = weighted.groupby(session).cumsum()
+        cum_volume = data["Volume"].groupby(session).cumsum()
+    else:
+        cum_weighted = weighted.cumsum()
+        cum_volume = data["Volume"].cumsum()
+    # Instruments without volume (forex, indices) fall back to the typical price
+    return (cum_weighted / cum_volume.replace(0, np.nan)).fillna(typical)
+
+
+def pivots(high: pd.Series, low: pd.Series, window: int = PIVOT_WINDOW) -> np.ndarray:
+    """Prices of swing highs and lows that dominate ``window`` candles on each side."""
+    span = 2 * window + 1
+    swing_high = high == high.rolling(span, center=True).max()
+    swing_low = low == low.rolling(span, center=True).min()
+    return np.concatenate([high[swing_high].to_numpy(), low[swing_low].to_numpy()])
+
+
+def cluster_levels(prices: np.ndarray, tolerance: float) -> pd.DataFrame:
+    """Merge prices closer than ``tolerance`` into levels, with how often each was hit."""
+    if prices.size == 0:
+        return pd.DataFrame({"level": [], "touches": []})
+    ordered = np.sort(prices)
+    group = np.concatenate([[0], np.cumsum(np.diff(ordered) > tolerance)])
+    touches = np.bincount(group)
+    levels = np.bincount(group, weights=ordered) / touches
+    return pd.DataFrame({"level": levels, "touches": touches})
+
+
+def support_resistance(
+    data: pd.DataFrame, atr_value: float, max_levels: int = MAX_LEVELS
+) -> Dict[str, List[float]]:
+    """The strongest clustered pivot levels below and above the last close."""
+    close = data["Close"].iloc[-1]
+    tolerance = atr_value * 0.5 if atr_value > 0 else close * 0.002
+    levels = cluster_levels(pivots(data["High"], data["Low"]), tolerance)
+    below = levels[levels["level"] < close].sort_values(
+        ["touches", "level"], ascending=[False, False]
+    )
+    above = levels[levels["level"] >= close].sort_values(
+        ["touches", "level"], ascending=[False, True]
+    )
+    return {
+        "support": sorted(below["level"].head(max_levels), reverse=True),
+        "resistance": sorted(above["level"].head(max_levels)),
+    }
+
+
+def downsample(data: pd.DataFrame, rows: int = SUMMARY_ROWS) -> pd.DataFrame:
+    """Aggregate candles into at most ``rows`` equal-sized buckets."""
+    if len(data) <= rows:
+        return data[["Open", "High", "Low", "Close", "Volume"]]
+    bucket = np.arange(len(data)) * rows // len(data)
+    summary = data.groupby(bucket).agg(
+        Open=("Open", "first"),
+        High=("High", "max"),
+        Low=("Low", "min"),
+        Close=("Close", "last"),
+        Volume=("Volume", "sum"),
+    )
+    # Label each bucket with the time of its first candle
+    summary.index = data.index[np.searchsorted(bucket, summary.index)]
+    return summary
+
+
+def stack(frames: Dict[str, pd.DataFrame], column: str) -> pd.DataFrame:
+    """One column of many OHLCV frames as a candles x symbols matrix.
+
+    Frames are aligned on their last candle rather than on timestamps, so
+    symbols trading different hours still line up candle for candle; shorter
+    histories are padded with NaN at the top. Rolling and exponential
+    indicators over the matrix match those computed symbol by symbol.
+    """
+    length = max((len(frame) for frame in frames.values()), default=0)
+    matrix = np.full((length, len(frames)), np.nan)
+    for i, frame in enumerate(frames.values()):
+        if len(frame):
+            matrix[length - len(frame) :, i] = frame[column].to_numpy()
+    return pd.DataFrame(matrix, columns=list(frames))
+
+
+def latest_many(frames: Dict[str, pd.DataFrame], window: int) -> pd.DataFrame:
+    """Latest indicator values for many symbols as a symbols x indicators table.
+
+    Moving averages, RSI, MACD, ATR and Bollinger bands are evaluated on
+    stacked matrices in one pass. Averages longer than a symbol's history are
+    NaN; window statistics only look at the last ``window`` candles.
+    """
+    frames = {symbol: frame for symbol, frame in frames.items() if len(frame)}
+    if not frames:
+        return pd.DataFrame()
+    close, high, low, volume = (
+        stack(frames, column) for column in ("Close", "High", "Low", "Volume")
+    )
+    recent_close = close.tail(window)
+    macd_line = ema(close, 12) - ema(close, 26)
+    macd_signal = ema(macd_line, 9)
+    bb_mid = sma(close, 20)
+    bb_std = close.rolling(20).std(ddof=0)
+    last = close.iloc[-1]
+
+    columns: Dict[str, pd.Series] = {
+        "price": last,
+        # The first real close inside the window, for symbols with a short history
+        "change_pct": (last / recent_close.bfill().iloc[0] - 1) * 100,
+        "high": high.tail(window).max(),
+        "low": low.tail(window).min(),
+        "volume": volume.iloc[-1],
+        "avg_volume": volume.tail(window).mean(),
+        "rsi": rsi(close).iloc[-1],
+        "macd": macd_line.iloc[-1],
+        "macd_signal": macd_signal.iloc[-1],
+        "macd_hist": (macd_line - macd_signal).iloc[-1],
+        "atr": atr(high, low, close).iloc[-1],
+        "bb_upper": (bb_mid + 2 * bb_std).iloc[-1],
+        "bb_mid": bb_mid.iloc[-1],
+        "bb_lower": (bb_mid - 2 * bb_std).iloc[-1],
+    }
+    counts = close.count()
+    for span in EMA_SPANS:
+        columns[f"ema{span}"] = ema(close, span).iloc[-1].where(counts >= span)
+    for window_size in SMA_WINDOWS:
+        columns[f"sma{window_size}"] = sma(close, window_size).iloc[-1]
+    return pd.DataFrame(columns)
+
+
+def snapshot_many(
+    frames: Dict[str, pd.DataFrame], window: int
+) -> Dict[str, Dict[str, object]]:
+    """``snapshot`` for many symbols, with the indicators computed in one pass.
+
+    Only VWAP sessions, pivot levels and the candle table are worked out per
+    symbol; everything else comes from ``latest_many``.
+    """
+    table = latest_many(frames, window)
+    averages = {f"ema{span}" for span in EMA_SPANS} | {
+        f"sma{window_size}" for window_size in SMA_WINDOWS
+    }
+    snapshots: Dict[str, Dict[str, object]] = {}
+    for symbol, row in zip(table.index, table.to_dict("records")):
+        # Averages longer than the history are left out rather than reported as NaN
+        values: Dict[str, object] = {
+            name: value
+            for name, value in row.items()
+            if not (name in averages and np.isnan(value))
+        }
+        frame = frames[symbol]
+        recent = frame.tail(window)
+        values["vwap"] = vwap(frame).iloc[-1]
+        values.update(support_resistance(recent, float(values["atr"])))
+        values["candles"] = downsample(recent)
+        snapshots[symbol] = values
+    return snapshots
+
+
+def snapshot(data: pd.DataFrame, window: int) -> Dict[str, object]:
+    """Latest indicator values plus a downsampled view of the last ``window`` candles.
+
+    Indicators are computed over the whole frame so longer averages are warmed
+    up; trend statistics and levels only look at the last ``window`` candles.
+    """
+    return snapshot_many({"": data}, window)[""]
+
+
+def fmt(value: float) -> str:
+    """Compact number formatting that keeps precision for tiny prices."""
+    if value is None or (isinstance(value, float) and np.isnan(value)):
+        return "n/a"
+    return f"{value:.6g}"
+
+
+def format_snapshot(values: Dict[str, object]) -> str:
+    """Render a snapshot as a compact, LLM-friendly text block."""
+    lines = [
+        f"Price: {fmt(values['price'])} ({values['change_pct']:+.2f}% over window)",
+        f"Window range: {fmt(values['low'])} - {fmt(values['high'])}",
+        f"Volume: last {fmt(values['volume'])}, window avg {fmt(values['avg_volume'])}",
+        f"RSI(14): {values['rsi']:.1f}",
+        f"MACD(12,26,9): line {fmt(values['macd'])}, signal {fmt(values['macd_signal'])}, "
+        f"hist {fmt(values['macd_hist'])}",
+        f"ATR(14): {fmt(values['atr'])}",
+        f"Bollinger(20,2): {fmt(values['bb_lower'])} / {fmt(values['bb_mid'])} / "
+        f"{fmt(values['bb_upper'])}",
+        f"VWAP: {fmt(values['vwap'])}",
+    ]
+    averages = [
+        f"{name.upper()} {fmt(values[name])}"
+        for name in ("ema9", "ema21", "ema50", "ema200", "sma20", "sma50")
+        if name in values
+    ]
+    if averages:
+        lines.append("Moving averages: " + ", ".join(averages))
+    lines.append(
+        "Support: " + (", ".join(fmt(v) for v in values["support"]) or "none found")
+    )
+    lines.append(
+        "Resistance: "
+        + (", ".join(fmt(v) for v in values["resistance"]) or "none found")
+    )
+
+    candles = values["candles"]
+    if candles.empty:
+        return "\n".join(lines)
+    table = pd.DataFrame(
+        {
+            "time": candles.index.strftime("%m-%d %H:%M"),
+            "o": candles["Open"].map(fmt),
+            "h": candles["High"].map(fmt),
+            "l": candles["Low"].map(fmt),
+            "c": candles["Close"].map(fmt),
+            "v": candles["Volume"].map(fmt),
+        }
+    )
+    lines.append(f"Candles ({len(candles)} buckets, oldest first):")
+    lines.append(table.to_csv(index=False, header=True).strip())
+    return "\n".join(lines)
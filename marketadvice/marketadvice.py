@@ -1,314 +1,1080 @@
-import discord
-from redbot.core import commands
-from groq import Groq
-import yfinance as yf
-import asyncio
-from collections import deque
-from datetime import datetime, timedelta
-import os
-from dotenv import load_dotenv
-
-load_dotenv()
-
-
-class MarketAdvice(commands.Cog):
-    def __init__(self, bot):
-        self.bot = bot
-        self.user_histories = {}  # Dictionary to store conversation history for each user
-        self.groq_client = Groq(api_key=os.getenv("GROQ_API_KEY"))
-        self.system_prompt = """You are a financial market analysis assistant. Analyze market data and provide insights on:
-        - Market trends and price action
-        - Support and resistance levels
-        - Technical indicators
-        - Trading recommendations
-        Be concise and focus on actionable insights."""
-        self.timeframe_candles = {
-            "1m": 600,  # 10 hours of 1-min data
-            "5m": 150,  # 12.5 hours of 5-min data
-            "15m": 100,  # 25 hours of 15-min data
-            "30m": 80,  # 40 hours of 30-min data
-            "1h": 60,  # 2.5 days of hourly data
-            "4h": 40,  # ~7 days of 4-hour data
-            "1d": 30,  # 1 month of daily data
-        }
-        self.request_queue = deque(maxlen=10)  # Queue for requests
-        self.user_cooldowns = {}  # Track user cooldowns
-        self.queue_lock = asyncio.Lock()  # Lock for queue operations
-        # Market type suffixes
-        self.market_suffixes = {
-            "crypto": ("-USD", "-USDT", "-BTC"),  # Crypto pairs
-            "forex": ("=X",),  # Forex pairs
-            "futures": ("=F",),  # Futures
-            "stocks": (".", ":"),  # Stocks with exchange suffixes
-        }
-
-    @commands.command(name="clear_history")
-    async def wipe_user_history(self, ctx):
-        """Wipe the conversation history for the user."""
-        user_id = ctx.author.id
-        if user_id in self.user_histories:
-            del self.user_histories[user_id]
-            await ctx.send("Your conversation history has been wiped.")
-        else:
-            await ctx.send("You have no conversation history to wipe.")
-
-    @commands.command(name="clear_all_histories")
-    @commands.is_owner()  # This ensures only the bot owner can use this command
-    async def wipe_all_history(self, ctx):
-        """Wipe all conversation histories."""
-        self.user_histories.clear()
-        await ctx.send("All conversation histories have been wiped.")
-
-    def format_symbol(self, symbol: str) -> str:
-        """Format symbol based on market type"""
-        symbol = symbol.upper()
-
-        # Check if symbol already has a market suffix
-        for suffixes in self.market_suffixes.values():
-            if any(symbol.endswith(suffix) for suffix in suffixes):
-                return symbol
-
-        # Add market-specific formatting
-        if "/" in symbol:  # Forex pair
-            symbol = symbol.replace("/", "") + "=X"
-        elif symbol.endswith("USD") or symbol.endswith("USDT"):  # Crypto
-            if not symbol.endswith("T"):  # If it ends in USD but not USDT
-                symbol = symbol[:-3] + "-USD"
-        elif symbol.startswith("BTC") or symbol.startswith("ETH"):  # Common crypto
-            symbol = symbol + "-USD"
-
-        return symbol
-
-    async def fetch_market_data(self, symbol, timeframe):
-        """Fetch market data using yfinance with error handling"""
-        try:
-            formatted_symbol = self.format_symbol(symbol)
-            ticker = yf.Ticker(formatted_symbol)
-            # Adjust period based on timeframe to ensure we get enough data
-            period_map = {
-                "1m": "1d",
-                "5m": "5d",
-                "15m": "5d",
-                "30m": "5d",
-                "1h": "7d",
-                "4h": "30d",
-                "1d": "60d",
-            }
-            period = period_map.get(timeframe, "5d")
-            hist = ticker.history(period=period, interval=timeframe)
-            if hist.empty:
-                raise ValueError(
-                    "No data available for the given symbol and timeframe."
-                )
-            return hist
-        except Exception as e:
-            print(f"Error fetching market data: {e}")
-            return None
-
-    async def generate_market_analysis(self, symbol, timeframe):
-        """Generate market analysis based on fetched data"""
-        try:
-            data = await self.fetch_market_data(symbol, timeframe)
-            if data is None:
-                return "No data available for the given symbol and timeframe."
-
-            current_price = data["Close"].iloc[-1]
-            volume = data["Volume"].iloc[-1]
-
-            # Get optimal number of candles for the timeframe
-            num_candles = self.timeframe_candles.get(timeframe, 100)
-            last_candles = data.tail(num_candles)
-            candle_data = []
-            for idx, row in last_candles.iterrows():
-                candle = {
-                    "timestamp": idx.strftime("%Y-%m-%d %H:%M"),
-                    "open": row["Open"],
-                    "high": row["High"],
-                    "low": row["Low"],
-                    "close": row["Close"],
-                    "volume": row["Volume"],
-                }
-                candle_data.append(candle)
-
-            # Prepare market data for AI analysis
-            market_prompt = f"""
-            Analyze the following market data for {symbol.upper()}:
-            Current price: ${current_price:.2f}
-            Trading volume: {volume}
-            Timeframe: {timeframe}
-
-            Last {num_candles} candlesticks:
-            {candle_data}
-
-            Provide a detailed analysis including the following points:
-            1. Market trend:
-            - Describe the overall market trend (e.g., bullish, bearish, sideways)
-            - Identify any significant candlestick patterns
-            2. Support and resistance levels:
-            - Identify key support and resistance levels based on recent price action
-            3. Technical indicators:
-            - Analyze important technical indicators (e.g., RSI, MACD, Moving Averages)
-            4. Trading recommendation:
-            - Clearly state a buy, sell, or hold recommendation
-            - Provide entry price and stop loss levels based on recent candlestick patterns
-            - List the top 3 reasons for the recommendation
-
-            Note: Use bullet points (•) for clarity and ensure the trading recommendation is very clear.
-            """
-
-            # Generate AI analysis
-            response = await self.generate_code_response(symbol, market_prompt)
-            if response:
-                return response
-            else:
-                return "Failed to generate market analysis. Please try again later. (Error: No response received.)"
-
-        except Exception as e:
-            return f"Error generating market analysis: {e}"
-
-    async def clean_response(self, response):
-        """Clean the response by removing any text before </think>"""
-        if "</think>" in response:
-            return response.split("</think>")[1].strip()
-        return response
-
-    async def generate_code_response(self, user_id, message):
-        """Centralized method to generate code response"""
-        try:
-            # Limit conversation history
-            if len(self.user_histories.get(user_id, [])) > 10:
-                self.user_histories[user_id] = self.user_histories[user_id][-10:]
-
-            # Add user message to history
-            if user_id not in self.user_histories:
-                self.user_histories[user_id] = []
-            self.user_histories[user_id].append({"role": "user", "content": message})
-
-            # Prepare messages for API call
-            messages = [
-                {"role": "system", "content": self.system_prompt},
-                *self.user_histories[user_id],
-            ]
-
-            # Generate response with timeout
-            async with asyncio.timeout(60):
-                completion = await asyncio.to_thread(
-                    self.groq_client.chat.completions.create,
-                    model="deepseek-r1-distill-llama-70b",
-                    messages=messages,
-                    temperature=0.5,
-                    max_tokens=16384,
-                    top_p=0.5,
-                    stream=False,
-                )
-
-            # Extract response
-            full_response = completion.choices[0].message.content
-
-            # Add AI response to history
-            self.user_histories[user_id].append(
-                {"role": "assistant", "content": full_response}
-            )
-
-            # Check if the response is None or empty
-            if not full_response:
-                print("Warning: Received empty response from AI.")
-                return None
-
-            return full_response
-
-        except asyncio.TimeoutError:
-            return "Request timed out. Please try again later."
-        except Exception as e:
-            print(f"Error in generate_code_response: {str(e)}")
-            return None
-
-    async def can_make_request(self, user_id, ctx):
-        """Check if user can make a request based on cooldown and queue"""
-        async with self.queue_lock:
-            now = datetime.now()
-
-            # Check user cooldown
-            if user_id in self.user_cooldowns:
-                last_request = self.user_cooldowns[user_id]
-                if now - last_request < timedelta(minutes=1):
-                    cooldown_end = last_request + timedelta(minutes=1)
-                    cooldown_msg = (
-                        f"You must wait, retry <t:{int(cooldown_end.timestamp())}:R>"
-                    )
-                    msg = await ctx.send(cooldown_msg)
-                    # Schedule message deletion at cooldown end
-                    wait_time = (cooldown_end - now).total_seconds()
-                    self.bot.loop.create_task(self.delete_after_delay(msg, wait_time))
-                    return False, None
-
-            # Check queue length
-            if len(self.request_queue) >= 10:
-                return False, "Queue is full. Please try again later."
-
-            # Add to queue and update cooldown
-            self.request_queue.append(user_id)
-            self.user_cooldowns[user_id] = now
-            return True, None
-
-    async def delete_after_delay(self, message, delay):
-        """Helper method to delete a message after a delay"""
-        await asyncio.sleep(delay)
-        try:
-            await message.delete()
-        except discord.NotFound:
-            pass
-
-    @commands.command(name="ma")
-    async def market_analysis(self, ctx, symbol: str, timeframe: str = "15m"):
-        """Generate market analysis based on user request"""
-        user_id = ctx.author.id
-
-        # Check if user can make request
-        can_request, error_msg = await self.can_make_request(user_id, ctx)
-        if not can_request:
-            if error_msg:
-                await ctx.send(error_msg)
-            return
-
-        processing_msg = await ctx.send("Generating market analysis...")
-
-        try:
-            # Generate market analysis
-            analysis = await self.generate_market_analysis(symbol, timeframe)
-            await processing_msg.delete()
-
-            # Check if analysis is None
-            if not analysis:
-                await ctx.send(
-                    "Market analysis failed: No response received.",
-                    reference=ctx.message,
-                )
-                return
-
-            # Clean the response
-            cleaned_analysis = await self.clean_response(analysis)
-
-            # Create and send embed
-            embed = discord.Embed(
-                title=f"Market Analysis for {symbol.upper()} ({timeframe})",
-                description=cleaned_analysis,
-                color=discord.Color.blue(),
-                timestamp=datetime.now(),
-            )
-            embed.set_footer(text=f"Requested by {ctx.author.display_name}")
-
-            # Send analysis in embed
-            await ctx.send(embed=embed, reference=ctx.message)
-
-        except Exception as e:
-            await ctx.send(f"Market analysis error: {e}", reference=ctx.message)
-        finally:
-            # Remove request from queue
-            async with self.queue_lock:
-                if user_id in self.request_queue:
-                    self.request_queue.remove(user_id)
-
-
-async def setup(bot):
-    await bot.add_cog(MarketAdvice(bot))
+import discord
+from redbot.core import commands, data_manager
+import yfinance as yf
+import pandas as pd
+import asyncio
+import concurrent.futures
+import json
+import pathlib
+import re
+import site
+import time
+from datetime import datetime
+from dotenv import load_dotenv
+
+from cogcore.expr import ExpressionError
+from cogcore.history import HistoryManager
+from cogcore.llm import acquire_groq, release_groq
+from cogcore.scheduler import Cooldowns, FairScheduler, QueueFull
+from cogcore.store import HistoryStore
+from cogcore.streaming import EmbedStreamer
+
+from . import backtest, charts, indicators, prompt, screener, timeframes
+from .alerts import Alert, AlertBook, parse_condition
+from .coalesce import SingleFlight
+from .ohlcv import OHLCVCache
+
+load_dotenv()
+
+MAX_ANALYSIS_CACHE_SECONDS: int = 300  # Longest a finished analysis is reused
+# Rendered charts are keyed by last candle, so reuse is safe
+CHART_CACHE_SECONDS: int = 3600
+MARKET_DATA_WORKERS: int = 4  # Concurrent yfinance downloads
+COMPUTE_WORKERS: int = 2  # Processes for CPU-heavy work such as backtests
+CHART_WORKERS: int = 1  # Processes rendering charts, kept apart from the backtests
+FETCH_TIMEOUT_SECONDS: float = 20.0  # Give up on a market data fetch after this long
+COMPUTE_TIMEOUT_SECONDS: float = 30.0  # Same, for work on the compute process pool
+BATCH_FETCH_TIMEOUT_SECONDS: float = 60.0  # Same, for a batched multi-symbol download
+WATCHLIST_MAX_SYMBOLS: int = 10  # Symbols one !ma watchlist may ask for
+DEFAULT_TIMEFRAME: str = "15m"  # Used by !ma when no timeframe is given
+ALERT_POLL_SECONDS: float = 60.0  # How often watched symbols are checked for alerts
+MAX_ALERTS_PER_USER: int = 20
+SCREEN_MAX_ANALYSES: int = 5  # Matching symbols a !screen forwards to the LLM
+SCREEN_MAX_LISTED: int = 25  # Matching symbols listed in the !screen results
+FOLLOWUP_HISTORY_TOKENS: int = 8000  # Prompt budget for !maask follow-up conversations
+REQUEST_WORKERS: int = 4  # Requests handled at once, matching the Groq concurrency
+MAX_QUEUED_REQUESTS: int = 20  # Requests waiting for a slot before refusing more
+REQUEST_COOLDOWN_SECONDS: float = 60.0  # Per-user wait between requests
+
+
+class MarketAnalysisError(Exception):
+    """Raised when an analysis can't be produced; the message is shown to the user."""
+
+
+class MarketAdvice(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+        self.groq = acquire_groq("MarketAdvice", concurrency=4)
+        self.system_prompt = """You are a financial market analysis assistant. Analyze market data and provide insights on:
+        - Market trends and price action
+        - Support and resistance levels
+        - Technical indicators
+        - Trading recommendations
+        Be concise and focus on actionable insights."""
+        self.model = "deepseek-r1-distill-llama-70b"
+        data_path = pathlib.Path(data_manager.cog_data_path(self))
+        # Analyses are stateless; only users who opt in keep a follow-up conversation
+        self.history = HistoryManager(
+            self.system_prompt,
+            budgets={self.model: FOLLOWUP_HISTORY_TOKENS},
+            store=HistoryStore(data_path / "followups.sqlite3"),
+        )
+        self.followup_path = data_path / "followup_users.json"
+        self.followup_users = set(self.load_json(self.followup_path, []))
+        self.alerts_path = data_path / "alerts.json"
+        self.alerts = AlertBook(
+            Alert.from_dict(data) for data in self.load_json(self.alerts_path, [])
+        )
+        self.alert_task = None
+        self.universe_path = data_path / "screen_universe.json"
+        self.screen_universe = list(
+            self.load_json(self.universe_path, screener.DEFAULT_UNIVERSE)
+        )
+        self.timeframe_candles = {
+            "1m": 600,  # 10 hours of 1-min data
+            "5m": 150,  # 12.5 hours of 5-min data
+            "15m": 100,  # 25 hours of 15-min data
+            "30m": 80,  # 40 hours of 30-min data
+            "1h": 60,  # 2.5 days of hourly data
+            "4h": 40,  # ~7 days of 4-hour data
+            "1d": 30,  # 1 month of daily data
+        }
+        self.timeframe_seconds = {
+            "1m": 60,
+            "5m": 300,
+            "15m": 900,
+            "30m": 1800,
+            "1h": 3600,
+            "4h": 14400,
+            "1d": 86400,
+        }
+        # Identical analyses for the same candle share one fetch and one LLM call
+        self.analyses = SingleFlight()
+        self.charts = SingleFlight(max_entries=64)
+        # Requests wait their turn round-robin across users
+        self.requests = FairScheduler(REQUEST_WORKERS, MAX_QUEUED_REQUESTS)
+        self.cooldowns = Cooldowns(REQUEST_COOLDOWN_SECONDS)
+        # Market type suffixes
+        self.market_suffixes = {
+            "crypto": ("-USD", "-USDT", "-BTC"),  # Crypto pairs
+            "forex": ("=X",),  # Forex pairs
+            "futures": ("=F",),  # Futures
+            "stocks": (".", ":"),  # Stocks with exchange suffixes
+        }
+        # Dedicated pool so blocking yfinance calls never run on the event loop
+        self.thread_pool = concurrent.futures.ThreadPoolExecutor(
+            max_workers=MARKET_DATA_WORKERS, thread_name_prefix="marketdata"
+        )
+        # CPU-bound number crunching runs in separate processes, off the GIL
+        self.process_pool = self.make_process_pool(COMPUTE_WORKERS)
+        # Charts render in their own processes, so a render that crashes its
+        # worker never fails a backtest running beside it
+        self.chart_pool = self.make_process_pool(CHART_WORKERS)
+        # Candles are kept between requests and only the new ones are downloaded
+        self.ohlcv = OHLCVCache(
+            self.download_history,
+            disk_dir=data_path / "ohlcv",
+            download_many=self.download_many,
+        )
+
+    async def cog_load(self):
+        """Start writing conversation history to disk and polling alerts in the background."""
+        self.history.store.start()
+        self.alert_task = asyncio.get_running_loop().create_task(self.alert_loop())
+
+    async def cog_unload(self):
+        """Stop alerts and market data fetches, flush history and release the Groq client."""
+        if self.alert_task is not None:
+            self.alert_task.cancel()
+        self.thread_pool.shutdown(wait=False, cancel_futures=True)
+        self.process_pool.shutdown(wait=False, cancel_futures=True)
+        self.chart_pool.shutdown(wait=False, cancel_futures=True)
+        await self.history.store.close()
+        await release_groq("MarketAdvice")
+
+    def load_json(self, path, default):
+        """Read a small JSON settings file, falling back to ``default``"""
+        try:
+            return json.loads(path.read_text())
+        except FileNotFoundError:
+            return default
+        except Exception as e:
+            print(f"Error reading {path.name}: {e}")
+            return default
+
+    def save_json(self, path, value):
+        """Blocking write of a small JSON settings file; only call this on the market data pool"""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(value))
+
+    @commands.command(name="mafollowup")
+    async def toggle_followup(self, ctx, mode: str = None):
+        """Turn follow-up questions on your analyses on or off (on/off, toggles by default)."""
+        user_id = ctx.author.id
+        if mode is None:
+            enabled = user_id not in self.followup_users
+        elif mode.lower() in ("on", "off"):
+            enabled = mode.lower() == "on"
+        else:
+            await ctx.send("Use `on` or `off`.")
+            return
+
+        if enabled:
+            self.followup_users.add(user_id)
+        else:
+            self.followup_users.discard(user_id)
+            await self.history.clear(user_id)
+        await self.run_blocking(
+            self.save_json, self.followup_path, sorted(self.followup_users)
+        )
+
+        if enabled:
+            await ctx.send(
+                "Follow-up mode is on. After an `!ma` analysis, ask about it with `!maask <question>`."
+            )
+        else:
+            await ctx.send(
+                "Follow-up mode is off and your follow-up history was wiped."
+            )
+
+    @commands.command(name="clear_history")
+    async def wipe_user_history(self, ctx):
+        """Wipe the follow-up conversation history for the user."""
+        user_id = ctx.author.id
+        if await self.history.clear(user_id):
+            await ctx.send("Your conversation history has been wiped.")
+        else:
+            await ctx.send("You have no conversation history to wipe.")
+
+    @commands.command(name="clear_all_histories")
+    @commands.is_owner()  # This ensures only the bot owner can use this command
+    async def wipe_all_history(self, ctx):
+        """Wipe all follow-up conversation histories."""
+        await self.history.clear_all()
+        await ctx.send("All conversation histories have been wiped.")
+
+    @commands.command(name="mastats")
+    @commands.is_owner()
+    async def analysis_stats(self, ctx):
+        """Show how often market analyses were shared instead of recomputed."""
+        stats = self.analyses.stats()
+        candles = self.ohlcv.stats()
+        served = stats["hits"] + stats["coalesced"] + stats["misses"]
+        shared = stats["hits"] + stats["coalesced"]
+        hit_rate = shared / served * 100 if served else 0.0
+        await ctx.send(
+            f"Analyses served: {served}\n"
+            f"• Cache hits: {stats['hits']}\n"
+            f"• Joined in-flight: {stats['coalesced']}\n"
+            f"• Computed: {stats['misses']}\n"
+            f"• Shared rate: {hit_rate:.1f}%\n"
+            f"• In flight now: {stats['in_flight']}, cached: {stats['cached']}\n"
+            f"Candle cache: {candles['frames']} frames, {candles['rows']} candles\n"
+            f"• Fresh hits: {candles['fresh_hits']}\n"
+            f"• Incremental fetches: {candles['delta_fetches']}\n"
+            f"• Full downloads: {candles['full_fetches']}\n"
+            f"Requests: {self.requests.running} running, {self.requests.waiting} queued, "
+            f"{len(self.cooldowns)} users cooling down"
+        )
+
+    def parse_analysis_request(self, request: str):
+        """Split ``!ma`` arguments into ``(symbols, timeframe)``, or None if malformed
+
+        The last word is the timeframe when it is a known one; everything before
+        it is one symbol or a comma-separated list of them. Symbols that format
+        to the same ticker (``BTC`` and ``BTC-USD``) are only kept once.
+        """
+        words = request.split()
+        timeframe = DEFAULT_TIMEFRAME
+        if len(words) > 1 and words[-1].lower() in timeframes.BASE_INTERVALS:
+            timeframe = words.pop().lower()
+        symbols = [symbol.strip().upper() for symbol in " ".join(words).split(",")]
+        symbols = [symbol for symbol in symbols if symbol]
+        # A space left inside a symbol is an unknown timeframe or a missing comma
+        if not symbols or any(" " in symbol for symbol in symbols):
+            return None
+        unique = {}
+        for symbol in symbols:
+            unique.setdefault(self.format_symbol(symbol), symbol)
+        return list(unique.values()), timeframe
+
+    def format_symbol(self, symbol: str) -> str:
+        """Format symbol based on market type"""
+        symbol = symbol.upper()
+
+        # Check if symbol already has a market suffix
+        for suffixes in self.market_suffixes.values():
+            if any(symbol.endswith(suffix) for suffix in suffixes):
+                return symbol
+
+        # Add market-specific formatting
+        if "/" in symbol:  # Forex pair
+            symbol = symbol.replace("/", "") + "=X"
+        elif symbol.endswith("USD") or symbol.endswith("USDT"):  # Crypto
+            if not symbol.endswith("T"):  # If it ends in USD but not USDT
+                symbol = symbol[:-3] + "-USD"
+        elif symbol.startswith("BTC") or symbol.startswith("ETH"):  # Common crypto
+            symbol = symbol + "-USD"
+
+        return symbol
+
+    @staticmethod
+    def make_process_pool(workers):
+        """Start a pool of compute worker processes"""
+        # Red imports cogs by path without adding their folder to sys.path, so
+        # spawned workers (Windows, macOS) couldn't unpickle marketadvice functions
+        cogs_dir = str(pathlib.Path(__file__).resolve().parent.parent)
+        return concurrent.futures.ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=site.addsitedir,
+            initargs=(cogs_dir,),
+        )
+
+    async def run_blocking(
+        self, func, *args, timeout=FETCH_TIMEOUT_SECONDS, executor=None
+    ):
+        """Run a blocking call on the market data pool, cancelling it on timeout
+
+        Pass ``executor=self.process_pool`` (or ``self.chart_pool``) for CPU-bound
+        work; ``func`` and its arguments must then be picklable.
+        """
+        executor = executor or self.thread_pool
+        try:
+            future = executor.submit(func, *args)
+            try:
+                return await asyncio.wait_for(asyncio.wrap_future(future), timeout)
+            finally:
+                # Drops the call if it is still queued; a running download is
+                # bounded by its own HTTP timeout
+                future.cancel()
+        except concurrent.futures.BrokenExecutor:
+            # A worker process died; a broken pool refuses every later call, so
+            # replace it for the next request
+            if executor is self.process_pool:
+                executor.shutdown(wait=False, cancel_futures=True)
+                self.process_pool = self.make_process_pool(COMPUTE_WORKERS)
+            elif executor is self.chart_pool:
+                executor.shutdown(wait=False, cancel_futures=True)
+                self.chart_pool = self.make_process_pool(CHART_WORKERS)
+            raise
+
+    async def fetch_market_data(self, symbol, timeframe):
+        """Fetch market data using yfinance with error handling"""
+        try:
+            formatted_symbol = self.format_symbol(symbol)
+            # Coarser timeframes are resampled from one cached base interval download
+            hist = await self.run_blocking(
+                timeframes.candles, self.ohlcv, formatted_symbol, timeframe
+            )
+            if hist.empty:
+                raise ValueError(
+                    "No data available for the given symbol and timeframe."
+                )
+            return hist
+        except asyncio.TimeoutError:
+            print(f"Timed out fetching market data for {symbol} ({timeframe})")
+            return None
+        except Exception as e:
+            print(f"Error fetching market data: {e}")
+            return None
+
+    def download_history(self, formatted_symbol, interval, period=None, start=None):
+        """Blocking yfinance download; only call this on the market data pool"""
+        ticker = yf.Ticker(formatted_symbol)
+        if start is not None:
+            return ticker.history(
+                start=start, interval=interval, timeout=FETCH_TIMEOUT_SECONDS / 2
+            )
+        return ticker.history(
+            period=period, interval=interval, timeout=FETCH_TIMEOUT_SECONDS / 2
+        )
+
+    def download_many(self, formatted_symbols, interval, period=None, start=None):
+        """Blocking batched yfinance download; only call this on the market data pool"""
+        window = {"start": start} if start is not None else {"period": period}
+        data = yf.download(
+            formatted_symbols,
+            interval=interval,
+            group_by="ticker",
+            auto_adjust=True,
+            progress=False,
+            timeout=FETCH_TIMEOUT_SECONDS / 2,
+            **window,
+        )
+        if data is None or data.empty:
+            return {}
+        if not isinstance(data.columns, pd.MultiIndex):
+            return {formatted_symbols[0]: data}
+        return {
+            symbol: data[symbol] for symbol in data.columns.get_level_values(0).unique()
+        }
+
+    async def fetch_many(self, symbols, timeframe):
+        """Fetch candles for many symbols in one batched download
+
+        Returns frames keyed by formatted symbol; symbols without data are left out.
+        """
+        return await self.run_blocking(
+            timeframes.candles_many,
+            self.ohlcv,
+            [self.format_symbol(symbol) for symbol in symbols],
+            timeframe,
+            timeout=BATCH_FETCH_TIMEOUT_SECONDS,
+        )
+
+    def analysis_key(self, symbol, timeframe):
+        """Key an analysis by symbol, timeframe and the last closed candle
+
+        Returns the key and how long a result for it stays fresh.
+        """
+        interval = self.timeframe_seconds.get(timeframe, 900)
+        now = time.time()
+        current_open = int(now // interval) * interval
+        last_closed = current_open - interval
+        ttl = min(current_open + interval - now, MAX_ANALYSIS_CACHE_SECONDS)
+        return (self.format_symbol(symbol), timeframe, last_closed), ttl
+
+    async def generate_market_analysis(self, symbol, timeframe, on_delta=None):
+        """Generate market analysis, sharing work between identical concurrent requests
+
+        Returns the prompt the analysis was made from, or None on failure, and
+        the analysis text or an error message.
+        """
+        key, ttl = self.analysis_key(symbol, timeframe)
+        try:
+            return await self.analyses.run(
+                key,
+                lambda: self.analyze_market(symbol, timeframe, on_delta=on_delta),
+                ttl,
+            )
+        except MarketAnalysisError as e:
+            return None, str(e)
+        except Exception as e:
+            return None, f"Error generating market analysis: {e}"
+
+    async def analyze_market(self, symbol, timeframe, on_delta=None):
+        """Fetch market data and run a fresh, size-capped AI analysis
+
+        Returns ``(prompt, response)``; raises MarketAnalysisError on failure.
+        """
+        data = await self.fetch_market_data(symbol, timeframe)
+        if data is None:
+            raise MarketAnalysisError(
+                "No data available for the given symbol and timeframe."
+            )
+
+        # Get optimal number of candles for the timeframe
+        num_candles = self.timeframe_candles.get(timeframe, 100)
+        # Precompute indicators so the prompt carries numbers, not raw candles
+        values = await self.run_blocking(indicators.snapshot, data, num_candles)
+        return await self.analyze_snapshot(
+            symbol.upper(),
+            timeframe,
+            min(num_candles, len(data)),
+            values,
+            on_delta=on_delta,
+        )
+
+    async def analyze_snapshot(
+        self,
+        symbol,
+        timeframe,
+        window,
+        values,
+        on_delta=None,
+        template=prompt.ANALYSIS_TEMPLATE,
+    ):
+        """Run the AI analysis on precomputed indicators; returns ``(prompt, response)``"""
+        # Every analysis starts from just the system prompt and this request
+        messages = prompt.build_analysis_messages(
+            self.system_prompt, symbol, timeframe, window, values, template=template
+        )
+        response = await self.complete(messages, on_delta=on_delta)
+        if not response:
+            raise MarketAnalysisError(
+                "Failed to generate market analysis. Please try again later. (Error: No response received.)"
+            )
+        return messages[-1]["content"], response
+
+    async def summarize_watchlist(self, symbols, timeframe):
+        """Summarize many symbols at once, yielding ``(symbol, summary)`` as each finishes
+
+        Data comes from one batched download and indicators from one vectorized
+        pass; the LLM calls run concurrently under the cog's Groq limit.
+        """
+        frames = await self.fetch_many(symbols, timeframe)
+        num_candles = self.timeframe_candles.get(timeframe, 100)
+        snapshots = await self.run_blocking(
+            indicators.snapshot_many, frames, num_candles
+        )
+
+        async def summarize(symbol):
+            if symbol not in snapshots:
+                return symbol, "No data available for this symbol and timeframe."
+            key, ttl = self.analysis_key(symbol, timeframe)
+            try:
+                _, summary = await self.analyses.run(
+                    ("watchlist",) + key,
+                    lambda: self.analyze_snapshot(
+                        symbol,
+                        timeframe,
+                        min(num_candles, len(frames[symbol])),
+                        snapshots[symbol],
+                        template=prompt.WATCHLIST_TEMPLATE,
+                    ),
+                    ttl,
+                )
+                return symbol, await self.clean_response(summary)
+            except MarketAnalysisError as e:
+                return symbol, str(e)
+            except Exception as e:
+                return symbol, f"Error generating market analysis: {e}"
+
+        formatted = [self.format_symbol(symbol) for symbol in symbols]
+        for finished in asyncio.as_completed([summarize(s) for s in formatted]):
+            yield await finished
+
+    async def render_chart(self, symbol, timeframe):
+        """PNG chart of the latest candles, or None if it can't be drawn
+
+        Rendering runs on the chart process pool; charts are shared per symbol,
+        timeframe and last candle.
+        """
+        if not charts.available():
+            return None
+        data = await self.fetch_market_data(symbol, timeframe)
+        if data is None or data.empty:
+            return None
+        data = data.tail(charts.CHART_CANDLES + charts.CHART_WARMUP)
+        formatted_symbol = self.format_symbol(symbol)
+        key = (formatted_symbol, timeframe, data.index[-1])
+        try:
+            return await self.charts.run(
+                key,
+                lambda: self.run_blocking(
+                    charts.render,
+                    f"{formatted_symbol} ({timeframe})",
+                    # Wall-clock times, so the labels match the exchange's hours
+                    data.index.tz_localize(None).to_numpy(),
+                    data["Open"].to_numpy(),
+                    data["High"].to_numpy(),
+                    data["Low"].to_numpy(),
+                    data["Close"].to_numpy(),
+                    timeout=COMPUTE_TIMEOUT_SECONDS,
+                    executor=self.chart_pool,
+                ),
+                CHART_CACHE_SECONDS,
+            )
+        except Exception as e:
+            print(f"Error rendering chart for {symbol} ({timeframe}): {e}")
+            return None
+
+    async def clean_response(self, response):
+        """Clean the response by removing any text before </think>"""
+        if "</think>" in response:
+            return response.split("</think>")[1].strip()
+        return response
+
+    def visible_analysis(self, response):
+        """Hide the model's reasoning while it is still streaming"""
+        if "</think>" in response:
+            return response.split("</think>")[1].strip()
+        if response.lstrip().startswith("<think>"):
+            return ""
+        return response
+
+    async def complete(self, messages, on_delta=None):
+        """Run one completion; returns None on failure and raises MarketAnalysisError on timeout"""
+        try:
+            async with asyncio.timeout(60):
+                full_response = await self.groq.complete(
+                    "MarketAdvice",
+                    on_delta=on_delta,
+                    model=self.model,
+                    messages=messages,
+                    temperature=0.5,
+                    max_tokens=16384,
+                    top_p=0.5,
+                )
+
+            # Check if the response is None or empty
+            if not full_response:
+                print("Warning: Received empty response from AI.")
+                return None
+
+            return full_response
+
+        except asyncio.TimeoutError:
+            raise MarketAnalysisError("Request timed out. Please try again later.")
+        except Exception as e:
+            print(f"Error in complete: {str(e)}")
+            return None
+
+    async def ask_followup(self, user_id, question, on_delta=None):
+        """Answer a follow-up question against the user's own analysis history"""
+        messages = await self.history.build_messages(user_id, question, self.model)
+        response = await self.complete(messages, on_delta=on_delta)
+        if response:
+            # Keep only the visible answer; the reasoning would just eat the budget
+            await self.history.add_reply(
+                user_id, await self.clean_response(response), self.model
+            )
+        return response
+
+    async def can_make_request(self, user_id, ctx):
+        """Check and start the user's cooldown, then wait for a worker slot
+
+        Returns True once a slot is held; the caller must release it with
+        ``self.requests.release()``.
+        """
+        remaining = self.cooldowns.remaining(user_id)
+        if remaining:
+            cooldown_end = int(time.time() + remaining)
+            msg = await ctx.send(f"You must wait, retry <t:{cooldown_end}:R>")
+            # Schedule message deletion at cooldown end
+            self.bot.loop.create_task(self.delete_after_delay(msg, remaining))
+            return False
+
+        queue_msg = None
+
+        async def on_queued(position):
+            nonlocal queue_msg
+            queue_msg = await ctx.send(
+                f"You are #{position} in the queue.", reference=ctx.message
+            )
+
+        # The cooldown starts before waiting, so one user can't fill the queue
+        # with requests that are all still waiting for their first slot
+        self.cooldowns.start(user_id)
+        try:
+            await self.requests.acquire(user_id, on_queued=on_queued)
+        except QueueFull:
+            self.cooldowns.cancel(user_id)
+            await ctx.send("Queue is full. Please try again later.")
+            return False
+        if queue_msg is not None:
+            self.bot.loop.create_task(self.delete_after_delay(queue_msg, 0))
+        return True
+
+    async def delete_after_delay(self, message, delay):
+        """Helper method to delete a message after a delay"""
+        await asyncio.sleep(delay)
+        try:
+            await message.delete()
+        except discord.NotFound:
+            pass
+
+    @commands.command(name="ma")
+    async def market_analysis(self, ctx, *, request: str):
+        """Generate market analysis based on user request
+
+        Usage: `!ma <symbol> [timeframe]`, e.g. `!ma BTC 1h`. Pass comma-separated
+        symbols (e.g. `!ma BTC, ETH, AAPL 4h`) for a watchlist summary.
+        """
+        parsed = self.parse_analysis_request(request)
+        if parsed is None:
+            await ctx.send(
+                "Usage: `!ma <symbol>[, <symbol>...] [timeframe]`. "
+                f"Timeframes: {', '.join(timeframes.BASE_INTERVALS)}."
+            )
+            return
+        symbols, timeframe = parsed
+        if len(symbols) > 1:
+            await self.watchlist_analysis(ctx, symbols, timeframe)
+            return
+        symbol = symbols[0]
+
+        user_id = ctx.author.id
+
+        # Check if user can make request
+        if not await self.can_make_request(user_id, ctx):
+            return
+
+        def make_embed(text):
+            embed = discord.Embed(
+                title=f"Market Analysis for {symbol.upper()} ({timeframe})",
+                description=text,
+                color=discord.Color.blue(),
+                timestamp=datetime.now(),
+            )
+            embed.set_footer(text=f"Requested by {ctx.author.display_name}")
+            return embed
+
+        # Draw the chart in parallel with the analysis
+        chart_task = asyncio.get_running_loop().create_task(
+            self.render_chart(symbol, timeframe)
+        )
+        # Everything after taking the slot is inside the try, so a failed send
+        # can't keep the slot forever
+        try:
+            processing_msg = await ctx.send(
+                "Generating market analysis...", reference=ctx.message
+            )
+            # Stream the analysis into the processing message once reasoning is done
+            streamer = EmbedStreamer(
+                ctx.send,
+                make_embed,
+                first_message=processing_msg,
+                transform=self.visible_analysis,
+            )
+
+            # Generate market analysis
+            market_prompt, analysis = await self.generate_market_analysis(
+                symbol, timeframe, on_delta=streamer.feed
+            )
+
+            # Check if analysis is None
+            if not analysis:
+                await processing_msg.edit(
+                    content="Market analysis failed: No response received."
+                )
+                return
+
+            # Clean the response and send the final version
+            cleaned_analysis = await self.clean_response(analysis)
+            await streamer.finish(cleaned_analysis)
+            if market_prompt:
+                chart = await chart_task
+                if chart:
+                    await streamer.attach_image(chart, "chart.png")
+
+            # Opted-in users can ask about this analysis with !maask
+            if market_prompt and user_id in self.followup_users:
+                await self.history.replace(user_id, market_prompt, cleaned_analysis)
+
+        except Exception as e:
+            await ctx.send(f"Market analysis error: {e}", reference=ctx.message)
+        finally:
+            chart_task.cancel()
+            self.requests.release()
+
+    async def watchlist_analysis(self, ctx, watchlist, timeframe: str):
+        """Summarize every symbol of a watchlist, one embed each"""
+        user_id = ctx.author.id
+        if len(watchlist) > WATCHLIST_MAX_SYMBOLS:
+            await ctx.send(
+                f"A watchlist can have at most {WATCHLIST_MAX_SYMBOLS} symbols."
+            )
+            return
+
+        # One cooldown for the whole watchlist
+        if not await self.can_make_request(user_id, ctx):
+            return
+
+        try:
+            processing_msg = await ctx.send(
+                f"Summarizing {len(watchlist)} symbols...", reference=ctx.message
+            )
+            await self.send_summaries(ctx, watchlist, timeframe, "Watchlist")
+            await processing_msg.edit(
+                content=f"Watchlist summary finished for {len(watchlist)} symbols."
+            )
+        except Exception as e:
+            await ctx.send(f"Watchlist analysis error: {e}", reference=ctx.message)
+        finally:
+            self.requests.release()
+
+    async def send_summaries(self, ctx, symbols, timeframe, label):
+        """Post one summary embed per symbol as each one finishes"""
+        done = 0
+        async for symbol, summary in self.summarize_watchlist(symbols, timeframe):
+            done += 1
+            embed = discord.Embed(
+                title=f"{symbol} ({timeframe})",
+                description=summary[:4096],
+                color=discord.Color.blue(),
+                timestamp=datetime.now(),
+            )
+            embed.set_footer(
+                text=f"{label} {done}/{len(symbols)} • Requested by {ctx.author.display_name}"
+            )
+            await ctx.send(embed=embed)
+
+    @commands.command(name="screen")
+    async def screen(self, ctx, timeframe: str, *, condition: str):
+        """Screen the symbol universe with an indicator condition
+
+        Example: `!screen 1h RSI < 30 and close above 50EMA`. Conditions can use
+        price/close, change_pct, high, low, volume, avg_volume, rsi, macd,
+        macd_signal, macd_hist, atr, bb_upper, bb_mid, bb_lower, ema9/21/50/200,
+        sma20/50, numbers, + - * /, comparisons, and/or/not, abs, min and max.
+        Only the matches are sent for AI analysis.
+        """
+        user_id = ctx.author.id
+        if timeframe not in timeframes.BASE_INTERVALS:
+            await ctx.send(
+                f"Timeframe must be one of: {', '.join(timeframes.BASE_INTERVALS)}."
+            )
+            return
+        try:
+            expression = screener.compile_condition(condition)
+        except ExpressionError as e:
+            await ctx.send(f"Invalid screen condition: {e}")
+            return
+
+        if not await self.can_make_request(user_id, ctx):
+            return
+
+        try:
+            processing_msg = await ctx.send(
+                f"Screening {len(self.screen_universe)} symbols...",
+                reference=ctx.message,
+            )
+            frames = await self.fetch_many(self.screen_universe, timeframe)
+            matches = await self.run_blocking(screener.screen, frames, expression)
+            if matches.empty:
+                await processing_msg.edit(
+                    content=f"No symbols out of {len(frames)} match `{condition}` on {timeframe}."
+                )
+                return
+
+            lines = [
+                f"**{symbol}** {indicators.fmt(row['price'])} "
+                f"({row['change_pct']:+.2f}%), RSI {row['rsi']:.1f}"
+                for symbol, row in matches.head(SCREEN_MAX_LISTED).iterrows()
+            ]
+            if len(matches) > SCREEN_MAX_LISTED:
+                lines.append(f"...and {len(matches) - SCREEN_MAX_LISTED} more")
+            embed = discord.Embed(
+                title=f"Screen: {condition} ({timeframe})",
+                description="\n".join(lines),
+                color=discord.Color.blue(),
+                timestamp=datetime.now(),
+            )
+            embed.set_footer(
+                text=f"{len(matches)} of {len(frames)} symbols matched • Requested by {ctx.author.display_name}"
+            )
+            await processing_msg.edit(content=None, embed=embed)
+
+            # Only the first few matches are worth an LLM call each
+            analysed = list(matches.index[:SCREEN_MAX_ANALYSES])
+            await self.send_summaries(ctx, analysed, timeframe, "Screen match")
+        except Exception as e:
+            await ctx.send(f"Screen error: {e}", reference=ctx.message)
+        finally:
+            self.requests.release()
+
+    @commands.command(name="screenuniverse")
+    @commands.is_owner()
+    async def screen_universe_settings(
+        self, ctx, action: str = "show", *, symbols: str = ""
+    ):
+        """Show or change the symbols !screen looks at
+
+        Actions: show, set, add, remove, reset. Symbols are comma or space separated.
+        """
+        action = action.lower()
+        given = [
+            self.format_symbol(symbol)
+            for symbol in re.split(r"[,\s]+", symbols)
+            if symbol
+        ]
+        if action == "set" and given:
+            universe = list(dict.fromkeys(given))
+        elif action == "add" and given:
+            universe = list(dict.fromkeys(self.screen_universe + given))
+        elif action == "remove" and given:
+            universe = [s for s in self.screen_universe if s not in set(given)]
+        elif action == "reset":
+            universe = list(screener.DEFAULT_UNIVERSE)
+        elif action == "show":
+            await ctx.send(
+                f"Screen universe ({len(self.screen_universe)} symbols): "
+                + ", ".join(self.screen_universe)[:1900]
+            )
+            return
+        else:
+            await ctx.send("Use `show`, `reset`, or `set`/`add`/`remove` with symbols.")
+            return
+
+        self.screen_universe = universe
+        await self.run_blocking(self.save_json, self.universe_path, universe)
+        await ctx.send(f"Screen universe now has {len(universe)} symbols.")
+
+    @commands.command(name="backtest")
+    async def run_backtest(
+        self, ctx, symbol: str, timeframe: str = "1d", strategy: str = "ema_cross"
+    ):
+        """Backtest one of the indicator signals behind !ma over cached history
+
+        Strategies: ema_cross, macd, rsi, bollinger, trend. Long only, with a
+        2 ATR stop and 0.1% fees per side.
+        """
+        strategy = strategy.lower()
+        if timeframe not in timeframes.BASE_INTERVALS:
+            await ctx.send(
+                f"Timeframe must be one of: {', '.join(timeframes.BASE_INTERVALS)}."
+            )
+            return
+        if strategy not in backtest.STRATEGIES:
+            await ctx.send(
+                "Strategy must be one of: "
+                + "; ".join(
+                    f"`{name}` ({description})"
+                    for name, (_, description) in backtest.STRATEGIES.items()
+                )
+            )
+            return
+
+        formatted_symbol = self.format_symbol(symbol)
+        try:
+            data = await self.run_blocking(
+                timeframes.candles,
+                self.ohlcv,
+                formatted_symbol,
+                timeframe,
+                True,
+                timeout=BATCH_FETCH_TIMEOUT_SECONDS,
+            )
+            if len(data) < 50:
+                await ctx.send("Not enough history to backtest this symbol.")
+                return
+            years = (data.index[-1] - data.index[0]).total_seconds() / (365.25 * 86400)
+            result = await self.run_blocking(
+                backtest.run,
+                strategy,
+                data["Open"].to_numpy(),
+                data["High"].to_numpy(),
+                data["Low"].to_numpy(),
+                data["Close"].to_numpy(),
+                len(data) / years if years > 0 else 252.0,
+                timeout=COMPUTE_TIMEOUT_SECONDS,
+                executor=self.process_pool,
+            )
+        except asyncio.TimeoutError:
+            await ctx.send("The backtest timed out. Please try again later.")
+            return
+        except Exception as e:
+            await ctx.send(f"Backtest error: {e}")
+            return
+
+        embed = discord.Embed(
+            title=f"Backtest: {formatted_symbol} ({timeframe}) {strategy}",
+            description=(
+                f"{backtest.STRATEGIES[strategy][1]}.\n"
+                f"{int(result['bars'])} candles from {data.index[0]:%Y-%m-%d} "
+                f"to {data.index[-1]:%Y-%m-%d}"
+            ),
+            color=discord.Color.blue(),
+            timestamp=datetime.now(),
+        )
+        embed.add_field(name="Return", value=f"{result['total_return']:+.2f}%")
+        embed.add_field(name="Buy & hold", value=f"{result['buy_hold_return']:+.2f}%")
+        embed.add_field(name="Max drawdown", value=f"{result['max_drawdown']:.2f}%")
+        embed.add_field(name="Trades", value=f"{int(result['trades'])}")
+        embed.add_field(name="Win rate", value=f"{result['win_rate']:.1f}%")
+        embed.add_field(name="Avg trade", value=f"{result['avg_trade']:+.2f}%")
+        embed.add_field(name="Profit factor", value=f"{result['profit_factor']:.2f}")
+        embed.add_field(name="Sharpe", value=f"{result['sharpe']:.2f}")
+        embed.add_field(
+            name="Exposure / stops",
+            value=f"{result['exposure']:.0f}% / {int(result['stops'])}",
+        )
+        embed.set_footer(text=f"Requested by {ctx.author.display_name}")
+        await ctx.send(embed=embed)
+
+    @commands.command(name="alert")
+    async def add_alert(self, ctx, symbol: str, timeframe: str, *, condition: str):
+        """Get pinged when a closed candle meets a condition
+
+        Examples: `!alert ETH-USD 15m crosses ema20`, `!alert BTC 1h rsi below 30`,
+        `!alert AAPL 1d price above 200`. Alerts fire once and are then removed.
+        """
+        if timeframe not in timeframes.BASE_INTERVALS:
+            await ctx.send(
+                f"Timeframe must be one of: {', '.join(timeframes.BASE_INTERVALS)}."
+            )
+            return
+        try:
+            metric, directions, level, description = parse_condition(condition)
+        except ValueError as e:
+            await ctx.send(str(e))
+            return
+        if len(self.alerts.for_user(ctx.author.id)) >= MAX_ALERTS_PER_USER:
+            await ctx.send(f"You can have at most {MAX_ALERTS_PER_USER} alerts.")
+            return
+
+        alert = Alert(
+            self.alerts.new_id(),
+            ctx.author.id,
+            ctx.channel.id,
+            self.format_symbol(symbol),
+            timeframe,
+            metric,
+            directions,
+            level,
+            description,
+        )
+        self.alerts.add(alert)
+        await self.save_alerts()
+        await ctx.send(
+            f"Alert #{alert.id} set: {alert.symbol} ({timeframe}) {description}."
+        )
+
+    @commands.command(name="alerts")
+    async def list_alerts(self, ctx):
+        """List your active alerts"""
+        alerts = sorted(self.alerts.for_user(ctx.author.id), key=lambda a: a.id)
+        if not alerts:
+            await ctx.send("You have no active alerts.")
+            return
+        await ctx.send(
+            "\n".join(
+                f"#{a.id}: {a.symbol} ({a.timeframe}) {a.description}" for a in alerts
+            )
+        )
+
+    @commands.command(name="alertdel")
+    async def delete_alert(self, ctx, alert_id: int):
+        """Delete one of your alerts by number"""
+        if self.alerts.remove(alert_id, ctx.author.id) is None:
+            await ctx.send(f"You have no alert #{alert_id}.")
+            return
+        await self.save_alerts()
+        await ctx.send(f"Alert #{alert_id} deleted.")
+
+    async def save_alerts(self):
+        """Write every active alert to the cog data path"""
+        await self.run_blocking(
+            self.save_json,
+            self.alerts_path,
+            [alert.to_dict() for alert in self.alerts.all()],
+        )
+
+    async def alert_loop(self):
+        """Background task that checks every watched symbol for alerts"""
+        await self.bot.wait_until_ready()
+        while True:
+            try:
+                await self.poll_alerts()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Error polling alerts: {e}")
+            await asyncio.sleep(ALERT_POLL_SECONDS)
+
+    async def poll_alerts(self):
+        """One alert tick: a batched download per timeframe, then O(1) work per symbol"""
+        fired = []
+        for timeframe, symbols in self.alerts.symbols_by_timeframe().items():
+            frames = await self.fetch_many(symbols, timeframe)
+            # A candle has closed once its whole interval is in the past
+            interval = pd.Timedelta(seconds=self.timeframe_seconds[timeframe])
+            closed_before = pd.Timestamp.now(tz="UTC") - interval
+            for symbol, frame in frames.items():
+                fired += await self.run_blocking(
+                    self.alerts.process, (symbol, timeframe), frame, closed_before
+                )
+        if not fired:
+            return
+
+        await self.save_alerts()
+        for alert, price in fired:
+            channel = self.bot.get_channel(alert.channel_id)
+            if channel is None:
+                continue
+            try:
+                await channel.send(
+                    f"<@{alert.user_id}> Alert #{alert.id}: {alert.symbol} "
+                    f"({alert.timeframe}) {alert.description} at {indicators.fmt(price)}.",
+                    allowed_mentions=discord.AllowedMentions(users=True),
+                )
+            except discord.HTTPException as e:
+                print(f"Failed to send alert #{alert.id}: {e}")
+
+    @commands.command(name="maask")
+    async def followup_question(self, ctx, *, question: str):
+        """Ask a follow-up question about your last market analysis"""
+        user_id = ctx.author.id
+        if user_id not in self.followup_users:
+            await ctx.send(
+                "Follow-up mode is off. Turn it on with `!mafollowup on`, then run `!ma` again."
+            )
+            return
+
+        if not await self.can_make_request(user_id, ctx):
+            return
+
+        def make_embed(text):
+            embed = discord.Embed(
+                title="Market Analysis Follow-up",
+                description=text,
+                color=discord.Color.blue(),
+                timestamp=datetime.now(),
+            )
+            embed.set_footer(text=f"Requested by {ctx.author.display_name}")
+            return embed
+
+        try:
+            processing_msg = await ctx.send("Thinking...", reference=ctx.message)
+            streamer = EmbedStreamer(
+                ctx.send,
+                make_embed,
+                first_message=processing_msg,
+                transform=self.visible_analysis,
+            )
+            answer = await self.ask_followup(user_id, question, on_delta=streamer.feed)
+            if not answer:
+                await processing_msg.edit(
+                    content="Follow-up failed: No response received."
+                )
+                return
+            await streamer.finish(await self.clean_response(answer))
+        except Exception as e:
+            await ctx.send(f"Follow-up error: {e}", reference=ctx.message)
+        finally:
+            self.requests.release()
+
+
+async def setup(bot):
+    await bot.add_cog(MarketAdvice(bot))
@@ -0,0 +1,416 @@
+import json
+import logging
+import os
+import pathlib
+import re
+import shutil
+import threading
+import time
+from collections import OrderedDict
+from contextlib import ExitStack, contextmanager
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+log = logging.getLogger("red.marketadvice.ohlcv")
+
+COLUMNS = ("Open", "High", "Low", "Close", "Volume")
+MAX_CACHED_ROWS: int = 500_000  # Total candles kept in memory across every frame
+REFRESH_SECONDS: float = 15.0  # Serve a frame without any fetch if it is this fresh
+MAX_DISK_BYTES: int = 512 * 2**20  # Column files kept on disk across every frame
+# Bumped when the on-disk layout changes; frames in an older layout are refetched
+DISK_FORMAT: int = 3
+PERIOD_UNIT_DAYS = {"d": 1, "wk": 7, "mo": 30, "y": 365}
+
+
+def period_days(period: str) -> float:
+    """Rough length of a yfinance ``period`` such as ``5d``, ``3mo`` or ``10y``."""
+    if period == "max":
+        return float("inf")
+    match = re.fullmatch(r"(\d+)(d|wk|mo|y)", period or "")
+    return int(match[1]) * PERIOD_UNIT_DAYS[match[2]] if match else 0.0
+
+
+class CachedFrame:
+    """One cached OHLCV frame plus the bookkeeping needed to top it up."""
+
+    __slots__ = ("frame", "fetched_at", "max_rows", "days")
+
+    def __init__(self, frame: pd.DataFrame, max_rows: int, days: float):
+        self.frame = frame
+        self.fetched_at = time.monotonic()
+        self.max_rows = max_rows  # Length of the original full download
+        self.days = days  # Period of the original full download, in days
+
+
+class OHLCVCache:
+    """Per-(symbol, interval) OHLCV frames that are topped up with only the new candles.
+
+    ``download(symbol, interval, period=None, start=None)`` is the blocking
+    yfinance call. A repeat request inside ``refresh`` seconds costs nothing;
+    after that only candles from the last cached bar onwards are fetched (the
+    last bar is re-fetched because it may still have been forming). Frames are
+    evicted least recently used first once ``max_rows`` candles are cached.
+    With ``disk_dir`` set, frames are also written as ``.npy`` columns and
+    memory-mapped back in after eviction or a restart; the least recently used
+    are deleted once the files take more than ``max_disk_bytes``. Asking for a
+    longer ``period`` than a frame was downloaded with replaces it with a new
+    full download; shorter periods are served from the longer frame.
+    ``download_many`` takes a list of symbols instead and returns a frame per
+    symbol; ``history_many`` uses it to fetch everything missing or stale in
+    one batched call.
+
+    Every method blocks and is meant to run on the market data thread pool.
+    """
+
+    def __init__(
+        self,
+        download: Callable[..., pd.DataFrame],
+        max_rows: int = MAX_CACHED_ROWS,
+        refresh: float = REFRESH_SECONDS,
+        disk_dir: Optional[pathlib.Path] = None,
+        download_many: Optional[Callable[..., Dict[str, pd.DataFrame]]] = None,
+        max_disk_bytes: int = MAX_DISK_BYTES,
+    ):
+        self.download = download
+        self.download_many = download_many
+        self.max_rows = max_rows
+        self.refresh = refresh
+        self.disk_dir = disk_dir
+        self.max_disk_bytes = max_disk_bytes
+        # Frame directory name -> bytes on disk, least recently used first;
+        # scanned from disk on first use
+        self._disk_sizes: "Optional[OrderedDict[str, int]]" = None
+        # Evicted frame directories that couldn't be deleted yet -> bytes left
+        self._undeleted: Dict[str, int] = {}
+        self._frames: "OrderedDict[Tuple[str, str], CachedFrame]" = OrderedDict()
+        self._rows = 0
+        self._lock = threading.Lock()
+        # Key -> [lock, threads holding or waiting on it]; dropped when unused
+        self._key_locks: Dict[Tuple[str, str], List] = {}
+        self.full_fetches = 0
+        self.delta_fetches = 0
+        self.fresh_hits = 0
+
+    def history(self, symbol: str, interval: str, period: str) -> pd.DataFrame:
+        """Return candles for ``symbol``/``interval`` covering roughly ``period``."""
+        key = (symbol, interval)
+        # One download per key at a time; other keys proceed in parallel
+        with self._key_lock(key):
+            cached = self._lookup(key, period)
+            if cached is not None and self._fresh(cached):
+                return cached.frame
+            if cached is None:
+                self.full_fetches += 1
+                return self._store_full(
+                    key, self.download(symbol, interval, period=period), period
+                )
+            self.delta_fetches += 1
+            delta = self.download(symbol, interval, start=cached.frame.index[-1])
+            return self._store_delta(key, cached, delta)
+
+    def history_many(
+        self, symbols: Iterable[str], interval: str, period: str
+    ) -> Dict[str, pd.DataFrame]:
+        """``history`` for many symbols, batching the downloads.
+
+        Missing symbols are fetched in one full download and stale ones in one
+        incremental download. Symbols with no data are left out of the result.
+        """
+        if self.download_many is None:
+            frames = {
+                symbol: self.history(symbol, interval, period) for symbol in symbols
+            }
+            return {
+                symbol: frame for symbol, frame in frames.items() if not frame.empty
+            }
+
+        keys = sorted({(symbol, interval) for symbol in symbols})
+        frames: Dict[str, pd.DataFrame] = {}
+        missing = []
+        stale: Dict[str, CachedFrame] = {}
+        with ExitStack() as stack:
+            # Always taken in sorted order so overlapping batches can't deadlock
+            for key in keys:
+                stack.enter_context(self._key_lock(key))
+            for key in keys:
+                cached = self._lookup(key, period)
+                if cached is None:
+                    missing.append(key[0])
+                elif self._fresh(cached):
+                    frames[key[0]] = cached.frame
+                else:
+                    stale[key[0]] = cached
+
+            if missing:
+                self.full_fetches += 1
+                downloaded = self.download_many(missing, interval, period=period)
+                for symbol in missing:
+                    frames[symbol] = self._store_full(
+                        (symbol, interval), downloaded.get(symbol), period
+                    )
+            if stale:
+                self.delta_fetches += 1
+                start = min(cached.frame.index[-1] for cached in stale.values())
+                downloaded = self.download_many(list(stale), interval, start=start)
+                for symbol, cached in stale.items():
+                    frames[symbol] = self._store_delta(
+                        (symbol, interval), cached, downloaded.get(symbol)
+                    )
+        return {symbol: frame for symbol, frame in frames.items() if not frame.empty}
+
+    def stats(self) -> Dict[str, int]:
+        """Counters for the owner stats command."""
+        with self._lock:
+            return {
+                "frames": len(self._frames),
+                "rows": self._rows,
+                "fresh_hits": self.fresh_hits,
+                "delta_fetches": self.delta_fetches,
+                "full_fetches": self.full_fetches,
+            }
+
+    @contextmanager
+    def _key_lock(self, key: Tuple[str, str]) -> Iterator[None]:
+        with self._lock:
+            entry = self._key_locks.setdefault(key, [threading.Lock(), 0])
+            entry[1] += 1
+        try:
+            with entry[0]:
+                yield
+        finally:
+            with self._lock:
+                entry[1] -= 1
+                if not entry[1]:
+                    del self._key_locks[key]
+
+    def _lookup(self, key: Tuple[str, str], period: str) -> Optional[CachedFrame]:
+        cached = self._get(key)
+        if cached is None:
+            cached = self._load_from_disk(key)
+        # A frame covering less history than asked for is as good as missing
+        if cached is not None and cached.days < period_days(period):
+            return None
+        return cached
+
+    def _fresh(self, cached: CachedFrame) -> bool:
+        if time.monotonic() - cached.fetched_at < self.refresh:
+            self.fresh_hits += 1
+            return True
+        return False
+
+    def _store_full(
+        self, key: Tuple[str, str], downloaded: Optional[pd.DataFrame], period: str
+    ) -> pd.DataFrame:
+        frame = self._clean(downloaded)
+        if frame.empty:
+            return frame
+        cached = CachedFrame(frame, len(frame), period_days(period))
+        self._put(key, cached)
+        self._save_to_disk(key, cached)
+        return frame
+
+    def _store_delta(
+        self,
+        key: Tuple[str, str],
+        cached: CachedFrame,
+        downloaded: Optional[pd.DataFrame],
+    ) -> pd.DataFrame:
+        delta = self._clean(downloaded)
+        cached.fetched_at = time.monotonic()
+        if delta.empty:
+            self._put(key, cached)
+            return cached.frame
+        merged = pd.concat([cached.frame, delta])
+        merged = merged[~merged.index.duplicated(keep="last")]
+        cached.frame = merged.tail(cached.max_rows)
+        self._put(key, cached)
+        self._save_to_disk(key, cached)
+        return cached.frame
+
+    @staticmethod
+    def _clean(frame: Optional[pd.DataFrame]) -> pd.DataFrame:
+        if frame is None or frame.empty:
+            return pd.DataFrame(columns=list(COLUMNS))
+        # Batched downloads pad each symbol with empty rows where others traded
+        frame = frame.loc[:, list(COLUMNS)].dropna(subset=["Close"])
+        return frame.astype("float64").sort_index()
+
+    def _get(self, key: Tuple[str, str]) -> Optional[CachedFrame]:
+        with self._lock:
+            cached = self._frames.get(key)
+            if cached is not None:
+                self._frames.move_to_end(key)
+            return cached
+
+    def _put(self, key: Tuple[str, str], cached: CachedFrame) -> None:
+        with self._lock:
+            previous = self._frames.pop(key, None)
+            if previous is not None:
+                self._rows -= len(previous.frame)
+            self._frames[key] = cached
+            self._rows += len(cached.frame)
+            while self._rows > self.max_rows and len(self._frames) > 1:
+                _, evicted = self._frames.popitem(last=False)
+                self._rows -= len(evicted.frame)
+
+    def _disk_path(self, key: Tuple[str, str]) -> Optional[pathlib.Path]:
+        if self.disk_dir is None:
+            return None
+        return self.disk_dir / re.sub(r"[^A-Za-z0-9_.-]", "_", "_".join(key))
+
+    def _save_to_disk(self, key: Tuple[str, str], cached: CachedFrame) -> None:
+        path = self._disk_path(key)
+        if path is None:
+            return
+        try:
+            path.mkdir(parents=True, exist_ok=True)
+            # Every write gets new file names, so files a loaded frame still maps
+            # are never written over; Windows refuses to replace or delete those
+            generation = time.time_ns()
+            index = cached.frame.index
+            # Saved as datetime64 so the file keeps its time unit, which yfinance
+            # and pandas versions don't agree on; aware indexes are stored in UTC
+            stamps = index.tz_convert("UTC").tz_localize(None) if index.tz else index
+            arrays = {"index": stamps.to_numpy()}
+            for column in COLUMNS:
+                arrays[column] = cached.frame[column].to_numpy()
+            for name, array in arrays.items():
+                np.save(path / f"{name}.{generation}.npy", array)
+            meta = {
+                "format": DISK_FORMAT,
+                "generation": generation,
+                "tz": str(index.tz) if index.tz else None,
+                "max_rows": cached.max_rows,
+                "days": cached.days,
+            }
+            # meta.json is never mapped, so swapping it in switches readers over
+            (path / "meta.tmp").write_text(json.dumps(meta))
+            os.replace(path / "meta.tmp", path / "meta.json")
+        except Exception as e:
+            log.warning(f"Failed to write OHLCV columns for {key}: {e}")
+            return
+        try:
+            for file in path.iterdir():
+                if file.name != "meta.json" and f".{generation}." not in file.name:
+                    try:
+                        file.unlink()
+                    except OSError:
+                        pass  # Still mapped; counted below, retried on the next write
+        except OSError:
+            pass  # Evicted by another thread meanwhile
+        self._track_disk(path, self._dir_size(path))
+
+    def _load_from_disk(self, key: Tuple[str, str]) -> Optional[CachedFrame]:
+        path = self._disk_path(key)
+        if path is None or not (path / "meta.json").exists():
+            return None
+        try:
+            meta = json.loads((path / "meta.json").read_text())
+            if meta.get("format") != DISK_FORMAT:
+                return None
+            generation = meta["generation"]
+            index = pd.DatetimeIndex(
+                np.load(path / f"index.{generation}.npy", mmap_mode="r")
+            )
+            if meta["tz"]:
+                index = index.tz_localize("UTC").tz_convert(meta["tz"])
+            # copy=False keeps one block per column so the frame reads straight
+            # from the mapped files instead of pulling them all into memory
+            frame = pd.DataFrame(
+                {
+                    column: np.load(path / f"{column}.{generation}.npy", mmap_mode="r")
+                    for column in COLUMNS
+                },
+                index=index,
+                copy=False,
+            )
+        except Exception as e:
+            log.warning(f"Failed to read OHLCV columns for {key}: {e}")
+            return None
+        cached = CachedFrame(frame, meta["max_rows"], meta.get("days", 0.0))
+        cached.fetched_at = 0.0  # Always top up a frame read back from disk
+        with self._lock:
+            sizes = self._disk_usage()
+            if path.name in sizes:
+                sizes.move_to_end(path.name)
+        return cached
+
+    def _disk_usage(self) -> "OrderedDict[str, int]":
+        """Bytes per frame directory, oldest write first. Call with ``_lock`` held."""
+        if self._disk_sizes is None:
+            frames = []
+            if self.disk_dir.is_dir():
+                for path in self.disk_dir.iterdir():
+                    if not path.is_dir():
+                        continue
+                    size = self._dir_size(path)
+                    try:
+                        written = (path / "meta.json").stat().st_mtime
+                    except OSError:
+                        self._undeleted[path.name] = size  # Eviction left it behind
+                        continue
+                    frames.append((written, path.name, size))
+            self._disk_sizes = OrderedDict(
+                (name, size) for _, name, size in sorted(frames)
+            )
+        return self._disk_sizes
+
+    def _track_disk(self, path: pathlib.Path, size: int) -> None:
+        """Record a frame written to ``path``, then delete old ones over the cap."""
+        with self._lock:
+            self._disk_usage()
+            retry = list(self._undeleted)
+        # Whatever earlier evictions couldn't delete goes first
+        for name in retry:
+            if self._delete_frame(self.disk_dir / name):
+                with self._lock:
+                    self._undeleted.pop(name, None)
+        evicted = []
+        with self._lock:
+            sizes = self._disk_usage()
+            sizes.pop(path.name, None)
+            self._undeleted.pop(path.name, None)
+            sizes[path.name] = size
+            total = sum(sizes.values()) + sum(self._undeleted.values())
+            while total > self.max_disk_bytes and len(sizes) > 1:
+                name, size = sizes.popitem(last=False)
+                total -= size
+                evicted.append(name)
+        undeleted = {}
+        for name in evicted:
+            if not self._delete_frame(self.disk_dir / name):
+                undeleted[name] = self._dir_size(self.disk_dir / name)
+        if not undeleted:
+            return
+        log.debug(f"Couldn't delete {len(undeleted)} OHLCV frames from disk yet")
+        with self._lock:
+            for name, size in undeleted.items():
+                if name not in self._disk_sizes:  # Unless written again meanwhile
+                    self._undeleted[name] = size
+
+    @staticmethod
+    def _delete_frame(path: pathlib.Path) -> bool:
+        """Delete a frame directory, returning False if any of it is left."""
+        try:
+            # meta.json goes first so a partly deleted frame is never read back
+            (path / "meta.json").unlink(missing_ok=True)
+            shutil.rmtree(path)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            # Windows won't delete files a loaded frame still memory-maps
+            log.debug(f"Failed to delete OHLCV frame {path.name}: {e}")
+            return False
+        return True
+
+    @staticmethod
+    def _dir_size(path: pathlib.Path) -> int:
+        size = 0
+        try:
+            for file in path.iterdir():
+                size += file.stat().st_size
+        except OSError:
+            pass  # Deleted while we looked
+        return size
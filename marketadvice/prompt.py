@@ -0,0 +1,73 @@
+from typing import Dict, List
+
+from cogcore.tokens import MESSAGE_OVERHEAD_TOKENS, count_tokens
+
+from . import indicators
+
+MAX_PROMPT_TOKENS: int = 4000  # Hard cap on the system prompt plus the analysis request
+CANDLE_ROW_STEPS = (indicators.SUMMARY_ROWS, 12, 6, 0)  # Tried in order until it fits
+
+ANALYSIS_TEMPLATE = """Analyze the following market data for {symbol}:
+Timeframe: {timeframe}
+Window: last {window} candles
+
+Precomputed indicators and a downsampled candle summary:
+{summary}
+
+Provide a detailed analysis including the following points:
+1. Market trend:
+- Describe the overall market trend (e.g., bullish, bearish, sideways)
+- Identify any significant candlestick patterns
+2. Support and resistance levels:
+- Use the clustered support and resistance levels above
+3. Technical indicators:
+- Interpret the precomputed RSI, MACD, moving averages, Bollinger bands, ATR and VWAP; do not recompute them
+4. Trading recommendation:
+- Clearly state a buy, sell, or hold recommendation
+- Provide entry price and stop loss levels, using ATR to size the stop
+- List the top 3 reasons for the recommendation
+
+Note: Use bullet points (•) for clarity and ensure the trading recommendation is very clear."""
+
+WATCHLIST_TEMPLATE = """Summarize the following market data for {symbol} as one entry of a watchlist:
+Timeframe: {timeframe}
+Window: last {window} candles
+
+Precomputed indicators and a downsampled candle summary:
+{summary}
+
+Reply with at most 5 short bullet points (•): the trend, the key support and resistance levels,
+what RSI and MACD say, and a clear buy, sell or hold call with an entry and an ATR-based stop loss."""
+
+
+def build_analysis_messages(
+    system_prompt: str,
+    symbol: str,
+    timeframe: str,
+    window: int,
+    values: Dict[str, object],
+    max_tokens: int = MAX_PROMPT_TOKENS,
+    template: str = ANALYSIS_TEMPLATE,
+) -> List[Dict[str, str]]:
+    """A fresh two-message prompt for one analysis, never larger than ``max_tokens``.
+
+    The candle table is the only part that grows with the data, so it is
+    downsampled further, and finally dropped, until the prompt fits. Raises
+    ``ValueError`` if even the bare indicators don't.
+    """
+    budget = max_tokens - count_tokens(system_prompt) - 2 * MESSAGE_OVERHEAD_TOKENS
+    candles = values["candles"]
+    for rows in CANDLE_ROW_STEPS:
+        table = indicators.downsample(candles, rows) if rows else candles.iloc[:0]
+        prompt = template.format(
+            symbol=symbol,
+            timeframe=timeframe,
+            window=window,
+            summary=indicators.format_snapshot({**values, "candles": table}),
+        )
+        if count_tokens(prompt) <= budget:
+            return [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": prompt},
+            ]
+    raise ValueError(f"Analysis prompt does not fit in {max_tokens} tokens.")
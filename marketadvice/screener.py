@@ -0,0 +1,86 @@
+import re
+from typing import Dict
+
+import numpy as np
+import pandas as pd
+
+from cogcore.expr import Expression, compile_expression
+
+from . import indicators
+
+SCREEN_WINDOW: int = 100  # Candles the window statistics (high, low, change_pct) cover
+
+# Screened when the owner hasn't configured a universe
+DEFAULT_UNIVERSE = (
+    "AAPL", "MSFT", "NVDA", "AMZN", "GOOGL", "META", "TSLA", "AVGO", "BRK-B", "JPM",
+    "V", "MA", "UNH", "XOM", "LLY", "JNJ", "PG", "HD", "COST", "ABBV",
+    "MRK", "CVX", "PEP", "KO", "BAC", "WMT", "NFLX", "ADBE", "CRM", "AMD",
+    "ORCL", "INTC", "CSCO", "QCOM", "TXN", "DIS", "NKE", "MCD", "BA", "CAT",
+    "GS", "MS", "PYPL", "UBER", "SHOP", "PLTR", "COIN", "SPY", "QQQ", "IWM",
+    "BTC-USD", "ETH-USD", "SOL-USD", "XRP-USD", "BNB-USD", "DOGE-USD", "ADA-USD",
+    "AVAX-USD", "LINK-USD", "LTC-USD",
+)  # fmt: skip
+
+# Extra names for indicator columns, so conditions read naturally
+ALIASES: Dict[str, str] = {"close": "price"}
+
+_MOVING_AVERAGE = re.compile(r"\b(\d+)\s*(ema|sma)\b", re.IGNORECASE)
+_WORDS = {"above": ">", "below": "<"}
+
+
+def variables() -> list:
+    """Every name a screen condition may use."""
+    names = [
+        "price",
+        "change_pct",
+        "high",
+        "low",
+        "volume",
+        "avg_volume",
+        "rsi",
+        "macd",
+        "macd_signal",
+        "macd_hist",
+        "atr",
+        "bb_upper",
+        "bb_mid",
+        "bb_lower",
+    ]
+    names += [f"ema{span}" for span in indicators.EMA_SPANS]
+    names += [f"sma{window}" for window in indicators.SMA_WINDOWS]
+    return names + list(ALIASES)
+
+
+def compile_condition(condition: str) -> Expression:
+    """Compile a screen condition such as ``RSI < 30 and close above 50EMA``.
+
+    ``above``/``below`` are read as ``>``/``<`` and ``50EMA`` as ``ema50``.
+    Raises ``cogcore.expr.ExpressionError`` if the condition isn't allowed.
+    """
+    condition = _MOVING_AVERAGE.sub(lambda m: f"{m.group(2)}{m.group(1)}", condition)
+    condition = re.sub(
+        r"\b(above|below)\b",
+        lambda m: _WORDS[m.group(1).lower()],
+        condition,
+        flags=re.IGNORECASE,
+    )
+    return compile_expression(condition, variables())
+
+
+def screen(
+    frames: Dict[str, pd.DataFrame], expression: Expression, window: int = SCREEN_WINDOW
+) -> pd.DataFrame:
+    """Rows of the latest indicator table whose symbols satisfy ``expression``.
+
+    The expression is evaluated once over whole columns, one element per
+    symbol; symbols missing an indicator it reads never match.
+    """
+    table = indicators.latest_many(frames, window)
+    if table.empty:
+        return table
+    namespace = {name: table[name].to_numpy() for name in table.columns}
+    namespace.update({alias: namespace[name] for alias, name in ALIASES.items()})
+    mask = np.broadcast_to(
+        np.asarray(expression.evaluate(namespace), dtype=bool), len(table)
+    )
+    return table[mask]
@@ -0,0 +1,88 @@
+from typing import Dict, List
+
+import pandas as pd
+
+from .ohlcv import OHLCVCache
+
+# Native yfinance interval each timeframe is derived from; timeframes sharing a
+# base share one cached download
+BASE_INTERVALS: Dict[str, str] = {
+    "1m": "1m",
+    "5m": "5m",
+    "15m": "5m",
+    "30m": "5m",
+    "1h": "1h",
+    "4h": "1h",
+    "1d": "1d",
+}
+# History fetched for each base interval, enough for the coarsest timeframe built on it
+BASE_PERIODS: Dict[str, str] = {
+    "1m": "1d",
+    "5m": "10d",
+    "1h": "60d",
+    "1d": "60d",
+}
+# Longest history yfinance serves for each base interval, used for backtests
+MAX_PERIODS: Dict[str, str] = {
+    "1m": "7d",
+    "5m": "60d",
+    "1h": "730d",
+    "1d": "10y",
+}
+RESAMPLE_RULES: Dict[str, str] = {
+    "15m": "15min",
+    "30m": "30min",
+    "4h": "4h",
+}
+DEFAULT_PERIOD: str = "5d"  # For intervals outside the table, passed to yfinance as-is
+
+AGGREGATION = {
+    "Open": "first",
+    "High": "max",
+    "Low": "min",
+    "Close": "last",
+    "Volume": "sum",
+}
+
+
+def resample(frame: pd.DataFrame, rule: str) -> pd.DataFrame:
+    """Aggregate OHLCV candles into ``rule`` buckets, dropping buckets with no trades.
+
+    Buckets are anchored to midnight in the frame's own timezone, so 4h bars
+    line up with 00:00, 04:00, 08:00 and so on.
+    """
+    bars = frame.resample(rule, label="left", closed="left").agg(AGGREGATION)
+    # Gaps such as nights and weekends leave empty buckets behind
+    return bars.dropna(subset=["Close"])
+
+
+def candles(
+    cache: OHLCVCache, symbol: str, timeframe: str, longest: bool = False
+) -> pd.DataFrame:
+    """Candles for ``timeframe``, built from the cached base interval download.
+
+    With ``longest`` the base interval covers all the history yfinance has
+    for it. Blocking; run it on the market data thread pool.
+    """
+    base = BASE_INTERVALS.get(timeframe)
+    if base is None:
+        return cache.history(symbol, timeframe, DEFAULT_PERIOD)
+    periods = MAX_PERIODS if longest else BASE_PERIODS
+    frame = cache.history(symbol, base, periods[base])
+    if timeframe == base or frame.empty:
+        return frame
+    return resample(frame, RESAMPLE_RULES[timeframe])
+
+
+def candles_many(
+    cache: OHLCVCache, symbols: List[str], timeframe: str
+) -> Dict[str, pd.DataFrame]:
+    """``candles`` for many symbols from one batched base interval download."""
+    base = BASE_INTERVALS.get(timeframe)
+    if base is None:
+        return cache.history_many(symbols, timeframe, DEFAULT_PERIOD)
+    frames = cache.history_many(symbols, base, BASE_PERIODS[base])
+    if timeframe == base:
+        return frames
+    rule = RESAMPLE_RULES[timeframe]
+    return {symbol: resample(frame, rule) for symbol, frame in frames.items()}
@@ -1,5 +1,5 @@
-from .mememarket import mememarket
-
-
-async def setup(bot):
-    await bot.add_cog(mememarket(bot))
+from .mememarket import mememarket
+
+
+async def setup(bot):
+    await bot.add_cog(mememarket(bot))
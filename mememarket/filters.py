@@ -0,0 +1,94 @@
+import time
+from operator import attrgetter
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from cogcore.expr import Expression, compile_expression
+
+from .records import Token
+
+# Rule used when neither the channel nor its guild has one
+DEFAULT_RULE = (
+    "10000 <= mcap <= 100000 and volume >= 25000 and 25000 <= liquidity <= 200000 "
+    "and age_hours < 24 and holders >= 50 and progress >= -5"
+)
+
+# Names a rule can use
+VARIABLES = ("mcap", "volume", "liquidity", "holders", "progress", "age_hours", "price")
+
+
+def decode_columns(tokens: List[Token]) -> Dict[str, np.ndarray]:
+    """Turn validated token records into one NumPy column per filter variable."""
+    count = len(tokens)
+
+    def column(name: str) -> np.ndarray:
+        return np.fromiter(map(attrgetter(name), tokens), dtype=float, count=count)
+
+    mcap = column("market_cap")
+    supply = column("supply") * 10 ** column("decimals")
+    with np.errstate(divide="ignore", invalid="ignore"):
+        price = np.where(supply != 0, mcap / supply, 0.0)
+    return {
+        "mcap": mcap,
+        "volume": column("volume"),
+        "liquidity": column("liquidity"),
+        "holders": column("holders"),
+        "progress": column("progress"),
+        "age_hours": (time.time() - column("timestamp") / 1000) / 3600,
+        "price": price,
+    }
+
+
+def compile_rule(rule: str) -> Expression:
+    """Compile a filter rule such as ``mcap < 50000 and holders >= 100``.
+
+    Raises ``cogcore.expr.ExpressionError`` if the rule isn't allowed.
+    """
+    return compile_expression(rule, VARIABLES)
+
+
+def survivors(expression: Expression, columns: Dict[str, np.ndarray]) -> np.ndarray:
+    """Indices of the tokens that pass, from one vectorized evaluation.
+
+    Comparisons with NaN are false, so tokens with NaN fields never pass.
+    """
+    count = len(columns["mcap"])
+    with np.errstate(invalid="ignore"):
+        mask = np.asarray(expression.evaluate(columns), dtype=bool)
+    return np.flatnonzero(np.broadcast_to(mask, count))
+
+
+class RuleBook:
+    """Filter rules per channel and per guild, each compiled once."""
+
+    def __init__(self, data: Optional[Dict[str, Dict[str, str]]] = None):
+        data = data or {}
+        self.channels: Dict[str, str] = dict(data.get("channels", {}))
+        self.guilds: Dict[str, str] = dict(data.get("guilds", {}))
+        self._compiled: Dict[str, Expression] = {}
+
+    def to_dict(self) -> Dict[str, Dict[str, str]]:
+        return {"channels": self.channels, "guilds": self.guilds}
+
+    def rule_for(self, channel_id: int, guild_id: Optional[int] = None) -> str:
+        """The channel's rule, else its guild's, else the default."""
+        rule = self.channels.get(str(channel_id))
+        if rule is None and guild_id is not None:
+            rule = self.guilds.get(str(guild_id))
+        return rule or DEFAULT_RULE
+
+    def expression(self, rule: str) -> Expression:
+        """The compiled form of ``rule``, compiling it on first use."""
+        expression = self._compiled.get(rule)
+        if expression is None:
+            expression = self._compiled[rule] = compile_rule(rule)
+        return expression
+
+    def set(self, scope: Dict[str, str], key: int, rule: Optional[str]) -> None:
+        """Set or, with ``rule=None``, remove a rule; raises ExpressionError if invalid."""
+        if rule is None:
+            scope.pop(str(key), None)
+            return
+        self.expression(rule)
+        scope[str(key)] = rule
@@ -1,305 +1,352 @@
-import discord
-from redbot.core import commands
-import requests
-import asyncio
-from collections import deque
-from datetime import datetime, timedelta
-import random
-import logging
-from dotenv import load_dotenv
-
-load_dotenv()
-
-
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(levelname)s - %(message)s",
-    handlers=[logging.StreamHandler()],
-)
-logger = logging.getLogger(__name__)
-
-
-class mememarket(commands.Cog):
-    def __init__(self, bot):
-        self.bot = bot
-        self.user_histories = {}
-        self.request_queue = deque(maxlen=10)
-        self.user_cooldowns = {}
-        self.queue_lock = asyncio.Lock()
-        self.channel_id = 1281393340637642822  # Set this to your channel ID
-        self.bg_task = None  # Initialize as None
-        self.seen_tokens = set()  # Track seen token addresses
-        logger.info("Mememarket cog initialized")
-
-    async def initialize(self):
-        """Initialize background task after cog is loaded"""
-        logger.info("Initializing background scanner...")
-        self.bg_task = self.bot.loop.create_task(self.background_scanner())
-
-    async def background_scanner(self):
-        """Background task to scan for new tokens"""
-        await self.bot.wait_until_ready()
-        logger.info("Background scanner started")
-        while not self.bot.is_closed():
-            try:
-                channel = self.bot.get_channel(self.channel_id)
-                logger.debug(f"Scanning channel: {self.channel_id}")
-
-                # Scan all token types
-                token_types = {1: "New Token", 2: "About to Graduate", 3: "Graduated"}
-
-                for type_id, type_name in token_types.items():
-                    logger.debug(f"Scanning token type {type_id}: {type_name}")
-                    tokens = await self.fetch_bullme_data(type_id)
-                    for token in tokens:
-                        if token["address"] in self.seen_tokens:
-                            logger.debug(
-                                f"Token {token['address']} already seen, skipping"
-                            )
-                            continue
-
-                        logger.info(
-                            f"New token found: {token['name']} ({token['symbol']})"
-                        )
-                        self.seen_tokens.add(token["address"])
-                        embed = discord.Embed(
-                            title=f"{type_name} Alert: {token['name']} ({token['symbol']})",
-                            description=f"Chain: {token['chain'].upper()}\nAddress: {token['address']}",
-                            color=discord.Color.green(),
-                        )
-                        embed.add_field(
-                            name="Market Cap", value=f"${token['marketCap']:,.2f}"
-                        )
-                        embed.add_field(
-                            name="24h Volume", value=f"${token['volume24h']:,.2f}"
-                        )
-                        embed.add_field(
-                            name="Liquidity", value=f"${token['liquidity']:,.2f}"
-                        )
-                        embed.add_field(
-                            name="Price", value=f"${float(token['priceUsd']):,.8f}"
-                        )
-                        embed.add_field(name="Holders", value=str(token["holders"]))
-                        embed.add_field(
-                            name="24h Change", value=f"{token['price_change_24h']}%"
-                        )
-                        await channel.send(embed=embed)
-                        logger.info(f"Alert sent for token {token['name']}")
-
-            except Exception as e:
-                logger.error(f"Error in background scanner: {str(e)}", exc_info=True)
-            await asyncio.sleep(15)  # Increased to 15 seconds
-            logger.debug("Scanner sleeping for 15 seconds")
-
-    async def fetch_bullme_data(self, type_id=1):
-        """Fetch token data from Bullme API"""
-        logger.info(f"Fetching Bullme data for type {type_id}")
-
-        user_agents = [
-            "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-            "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:121.0) Gecko/20100101 Firefox/121.0",
-            "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.2 Safari/605.1.15",
-            "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Edge/120.0.0.0",
-        ]
-
-        headers = {
-            "User-Agent": random.choice(user_agents),
-            "Accept": "application/json, text/plain, */*",
-            "Accept-Language": "en-US,en;q=0.9",
-            "Accept-Encoding": "gzip, deflate, br",
-            "Connection": "keep-alive",
-            "Cache-Control": "no-cache",
-            "Pragma": "no-cache",
-            "Sec-Fetch-Dest": "empty",
-            "Sec-Fetch-Mode": "cors",
-            "Sec-Fetch-Site": "same-site",
-            "Origin": "https://bullme.one",
-            "Referer": "https://bullme.one/",
-            "DNT": "1",
-            "Cookie": "",
-        }
-
-        await asyncio.sleep(random.uniform(1, 3))
-        logger.debug("Sleeping before API request")
-
-        url = f"https://api.bullme.one/market/token/tokens?type={type_id}"
-
-        for attempt in range(3):
-            try:
-                headers["User-Agent"] = random.choice(user_agents)
-                logger.debug(f"API request attempt {attempt + 1}")
-
-                response = requests.get(url, headers=headers, verify=False, timeout=30)
-                logger.info(f"API response status: {response.status_code}")
-
-                if response.status_code == 403:
-                    logger.warning("403 Forbidden - Waiting before retry...")
-                    await asyncio.sleep(10 + (attempt * 5))
-                    continue
-
-                if response.status_code == 200:
-                    try:
-                        data = response.json()
-                        logger.debug("Successfully parsed JSON response")
-                        logger.debug(f"JSON response: {data}")
-                    except ValueError as e:
-                        logger.error(f"JSON decode error: {str(e)}")
-                        await asyncio.sleep(10 + (attempt * 5))
-                        continue
-
-                    total_tokens = len(data.get("data", []))
-                    logger.info(f"Total tokens found: {total_tokens}")
-
-                    filtered_tokens = []
-                    max_age = datetime.now() - timedelta(hours=24)
-
-                    for token in data.get("data", []):
-                        try:
-                            mcap = float(token.get("marketCap", 0))
-                            volume = float(token.get("tradeVolume", 0))
-                            liquidity = float(token.get("liquidity", 0))
-                            created_at = datetime.fromtimestamp(
-                                int(token.get("timestamp", 0) / 1000)
-                            )
-                            holders = float(token.get("top10Holder", 0)) * 100
-                            price_change = float(token.get("bondingCurveProgress", 0))
-                            total_supply = float(token.get("totalSupply", 0)) * (
-                                10 ** token.get("decimals", 6)
-                            )
-
-                            # Calculate price
-                            if total_supply != 0:
-                                price_usd = mcap / total_supply
-                            else:
-                                price_usd = 0.0
-
-                            if (
-                                10000 <= mcap <= 100000
-                                and volume >= 25000
-                                and 25000 <= liquidity <= 200000
-                                and created_at > max_age
-                                and holders >= 50
-                                and price_change >= -5.0
-                            ):
-                                logger.debug(
-                                    f"Token {token.get('name')} passed filters"
-                                )
-                                token_info = {
-                                    "name": token.get("name", "Unknown"),
-                                    "symbol": token.get("symbol", "Unknown"),
-                                    "address": token.get("address", ""),
-                                    "marketCap": mcap,
-                                    "volume24h": volume,
-                                    "liquidity": liquidity,
-                                    "priceUsd": price_usd,
-                                    "chain": "solana",
-                                    "age": created_at,
-                                    "holders": holders,
-                                    "price_change_24h": price_change,
-                                    "creator": token.get("creator", "Unknown"),
-                                    "website": token.get("website", ""),
-                                    "twitter": token.get("twitter", ""),
-                                    "telegram": token.get("telegram", ""),
-                                    "rugcheck_score": token.get(
-                                        "rugcheck_score", "N/A"
-                                    ),
-                                    "quick_buy_links": token.get("quick_buy_links", []),
-                                }
-                                filtered_tokens.append(token_info)
-                        except (ValueError, TypeError) as e:
-                            logger.error(f"Error processing token: {str(e)}")
-                            continue
-
-                    logger.info(f"Found {len(filtered_tokens)} filtered tokens")
-                    return filtered_tokens
-                else:
-                    logger.error(f"Error: Status code {response.status_code}")
-                    await asyncio.sleep(10 + (attempt * 5))
-
-            except requests.exceptions.RequestException as e:
-                logger.error(f"Request error: {str(e)}")
-                await asyncio.sleep(10 + (attempt * 5))
-            except Exception as e:
-                logger.error(f"Unexpected error: {str(e)}", exc_info=True)
-                await asyncio.sleep(10 + (attempt * 5))
-
-        logger.error("All retry attempts failed")
-        return []
-
-    @commands.command()
-    @commands.is_owner()
-    async def testapis(self, ctx):
-        """Test API connectivity and responses"""
-        logger.info("Starting API tests...")
-        await ctx.send("Starting API connectivity tests...")
-
-        for type_id in [1, 2, 3]:
-            logger.info(f"Testing Bullme API type {type_id}")
-            tokens = await self.fetch_bullme_data(type_id)
-            if tokens:
-                logger.info(f"Bullme API type {type_id} working")
-                test_token = tokens[0]
-                logger.info(
-                    f"Sample token found: {test_token['name']} ({test_token['symbol']})"
-                )
-                logger.info("Token details:")
-                logger.info(f"  - Address: {test_token['address']}")
-                logger.info(f"  - Market Cap: ${test_token['marketCap']:,.2f}")
-                logger.info(f"  - Volume 24h: ${test_token['volume24h']:,.2f}")
-                logger.info(f"  - Liquidity: ${test_token['liquidity']:,.2f}")
-                logger.info(f"  - Holders: {test_token.get('holders', 'N/A')}")
-                logger.info(
-                    f"  - 24h Price Change: {test_token.get('price_change_24h', 'N/A')}%"
-                )
-            else:
-                logger.error(f"Bullme API type {type_id} failed")
-
-        logger.info("API tests completed")
-        await ctx.send("API tests completed - check console for detailed results")
-
-    @commands.command()
-    @commands.is_owner()
-    async def forcescan(self, ctx):
-        """Force an immediate token scan"""
-        logger.info("Starting forced token scan")
-        await ctx.send("Starting forced token scan...")
-        channel = self.bot.get_channel(self.channel_id)
-        if channel:
-            token_types = {1: "New Token", 2: "About to Graduate", 3: "Graduated"}
-
-            for type_id, type_name in token_types.items():
-                logger.info(f"Scanning type {type_id}: {type_name}")
-                tokens = await self.fetch_bullme_data(type_id)
-                for token in tokens:
-                    if token["address"] in self.seen_tokens:
-                        logger.debug(f"Token {token['address']} already seen, skipping")
-                        continue
-
-                    logger.info(f"New token found: {token['name']}")
-                    self.seen_tokens.add(token["address"])
-                    embed = discord.Embed(
-                        title=f"{type_name} Alert: {token['name']} ({token['symbol']})",
-                        description=f"Chain: {token['chain'].upper()}\nAddress: {token['address']}",
-                        color=discord.Color.green(),
-                    )
-                    embed.add_field(
-                        name="Market Cap", value=f"${token['marketCap']:,.2f}"
-                    )
-                    embed.add_field(
-                        name="24h Volume", value=f"${token['volume24h']:,.2f}"
-                    )
-                    embed.add_field(
-                        name="Liquidity", value=f"${token['liquidity']:,.2f}"
-                    )
-                    embed.add_field(
-                        name="Price", value=f"${float(token['priceUsd']):,.8f}"
-                    )
-                    embed.add_field(name="Holders", value=str(token["holders"]))
-                    embed.add_field(
-                        name="24h Change", value=f"{token['price_change_24h']}%"
-                    )
-                    await channel.send(embed=embed)
-                    logger.info(f"Alert sent for token {token['name']}")
-        logger.info("Forced scan completed")
-        await ctx.send("Forced scan completed")
+import discord
+from redbot.core import commands, data_manager
+import aiohttp
+import asyncio
+import json
+import pathlib
+import random
+import logging
+from dotenv import load_dotenv
+
+from cogcore.expr import ExpressionError
+
+from . import filters
+from .records import decode_tokens
+from .seen import SeenIndex
+
+load_dotenv()
+
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(levelname)s - %(message)s",
+    handlers=[logging.StreamHandler()],
+)
+logger = logging.getLogger(__name__)
+
+MAX_CONNECTIONS: int = 10  # Pooled keep-alive connections to the Bullme API
+DNS_CACHE_SECONDS: int = 300  # How long resolved API addresses are reused
+REQUEST_TIMEOUT_SECONDS: float = 20.0  # Deadline for one API request, body included
+CONNECT_TIMEOUT_SECONDS: float = 5.0
+SCAN_INTERVAL_SECONDS: float = 15.0  # Pause between two fetches of the same feed
+LOG_SAMPLE_EVERY: int = 50  # Fetches between two debug samples of decoded tokens
+
+# Bullme token feed type -> name used in alerts
+TOKEN_FEEDS = {1: "New Token", 2: "About to Graduate", 3: "Graduated"}
+
+
+class mememarket(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+        self.user_histories = {}
+        self.channel_id = 1281393340637642822  # Set this to your channel ID
+        self.bg_task = None  # Initialize as None
+        self.session = None  # Created in cog_load, inside the running event loop
+        self.fetch_count = 0
+        data_path = pathlib.Path(data_manager.cog_data_path(self))
+        # Addresses already alerted on, kept across restarts
+        self.seen_tokens = SeenIndex(data_path / "seen_tokens")
+        # Token filter rules per channel and guild
+        self.filters_path = data_path / "filters.json"
+        try:
+            rules = json.loads(self.filters_path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            rules = {}
+        except ValueError as e:
+            logger.error(f"Error reading {self.filters_path.name}: {e}")
+            rules = {}
+        self.rules = filters.RuleBook(rules)
+        logger.info("Mememarket cog initialized")
+
+    async def cog_load(self):
+        """Open the HTTP session and start the background scanner."""
+        await self.initialize()
+
+    async def cog_unload(self):
+        """Stop the scanner and close the HTTP session, cancelling requests in flight."""
+        if self.bg_task is not None:
+            self.bg_task.cancel()
+        if self.session is not None:
+            await self.session.close()
+        await self.seen_tokens.flush()
+
+    async def initialize(self):
+        """Initialize background task after cog is loaded"""
+        logger.info("Initializing background scanner...")
+        await self.seen_tokens.load()
+        # One long-lived session keeps connections to the API alive between scans
+        self.session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(
+                limit=MAX_CONNECTIONS, ttl_dns_cache=DNS_CACHE_SECONDS, ssl=False
+            ),
+            timeout=aiohttp.ClientTimeout(
+                total=REQUEST_TIMEOUT_SECONDS, connect=CONNECT_TIMEOUT_SECONDS
+            ),
+        )
+        self.bg_task = asyncio.get_running_loop().create_task(self.background_scanner())
+
+    async def background_scanner(self):
+        """Background task to scan for new tokens
+
+        Every feed is fetched on its own schedule, so a slow or retrying feed
+        never holds the others back. Results meet in one queue, where a single
+        consumer deduplicates them and sends the alerts.
+        """
+        await self.bot.wait_until_ready()
+        logger.info("Background scanner started")
+        results = asyncio.Queue()
+        feeds = [
+            asyncio.get_running_loop().create_task(self.scan_feed(type_id, results))
+            for type_id in TOKEN_FEEDS
+        ]
+        try:
+            while not self.bot.is_closed():
+                type_id, tokens = await results.get()
+                try:
+                    channel = self.bot.get_channel(self.channel_id)
+                    await self.announce_tokens(channel, TOKEN_FEEDS[type_id], tokens)
+                except Exception as e:
+                    logger.error(
+                        f"Error in background scanner: {str(e)}", exc_info=True
+                    )
+        finally:
+            for feed in feeds:
+                feed.cancel()
+
+    async def scan_feed(self, type_id, results):
+        """Fetch one token feed forever, queueing each result for the alert stage"""
+        while not self.bot.is_closed():
+            logger.debug("Scanning token type %s: %s", type_id, TOKEN_FEEDS[type_id])
+            try:
+                await results.put((type_id, await self.fetch_bullme_data(type_id)))
+            except Exception as e:
+                logger.error(f"Error scanning type {type_id}: {str(e)}", exc_info=True)
+            await asyncio.sleep(SCAN_INTERVAL_SECONDS)
+
+    def log_sample(self, type_id, tokens):
+        """Log a few decoded tokens at debug level, once every LOG_SAMPLE_EVERY fetches"""
+        self.fetch_count += 1
+        if self.fetch_count % LOG_SAMPLE_EVERY == 1 and logger.isEnabledFor(
+            logging.DEBUG
+        ):
+            logger.debug("Type %s sample: %r", type_id, tokens[:3])
+
+    async def announce_tokens(self, channel, type_name, tokens):
+        """Send an alert for every token that hasn't been seen yet"""
+        for token in tokens:
+            if token.address in self.seen_tokens:
+                logger.debug("Token %s already seen, skipping", token.address)
+                continue
+
+            logger.info("New token found: %s (%s)", token.name, token.symbol)
+            self.seen_tokens.add(token.address)
+            embed = discord.Embed(
+                title=f"{type_name} Alert: {token.name} ({token.symbol})",
+                description=f"Chain: {token.chain.upper()}\nAddress: {token.address}",
+                color=discord.Color.green(),
+            )
+            embed.add_field(name="Market Cap", value=f"${token.market_cap:,.2f}")
+            embed.add_field(name="24h Volume", value=f"${token.volume:,.2f}")
+            embed.add_field(name="Liquidity", value=f"${token.liquidity:,.2f}")
+            embed.add_field(name="Price", value=f"${token.price_usd:,.8f}")
+            embed.add_field(name="Holders", value=f"{token.holders:g}")
+            embed.add_field(name="24h Change", value=f"{token.progress}%")
+            await channel.send(embed=embed)
+            logger.info("Alert sent for token %s", token.name)
+        await self.seen_tokens.flush()
+
+    def alert_rule(self):
+        """The filter rule for the alert channel"""
+        channel = self.bot.get_channel(self.channel_id)
+        guild = getattr(channel, "guild", None)
+        return self.rules.rule_for(self.channel_id, guild.id if guild else None)
+
+    async def fetch_bullme_data(self, type_id=1, rule=None):
+        """Fetch token data from Bullme API
+
+        Tokens are filtered with ``rule``, by default the alert channel's rule.
+        """
+        logger.debug("Fetching Bullme data for type %s", type_id)
+        expression = self.rules.expression(rule or self.alert_rule())
+
+        user_agents = [
+            "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+            "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:121.0) Gecko/20100101 Firefox/121.0",
+            "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.2 Safari/605.1.15",
+            "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Edge/120.0.0.0",
+        ]
+
+        headers = {
+            "User-Agent": random.choice(user_agents),
+            "Accept": "application/json, text/plain, */*",
+            "Accept-Language": "en-US,en;q=0.9",
+            "Accept-Encoding": "gzip, deflate",
+            "Connection": "keep-alive",
+            "Cache-Control": "no-cache",
+            "Pragma": "no-cache",
+            "Sec-Fetch-Dest": "empty",
+            "Sec-Fetch-Mode": "cors",
+            "Sec-Fetch-Site": "same-site",
+            "Origin": "https://bullme.one",
+            "Referer": "https://bullme.one/",
+            "DNT": "1",
+            "Cookie": "",
+        }
+
+        await asyncio.sleep(random.uniform(1, 3))
+        logger.debug("Sleeping before API request")
+
+        url = f"https://api.bullme.one/market/token/tokens?type={type_id}"
+
+        for attempt in range(3):
+            try:
+                headers["User-Agent"] = random.choice(user_agents)
+                logger.debug("API request attempt %d", attempt + 1)
+
+                async with self.session.get(url, headers=headers) as response:
+                    status = response.status
+                    logger.debug("API response status: %s", status)
+                    if status == 200:
+                        body = await response.read()
+
+                if status == 403:
+                    logger.warning("403 Forbidden - Waiting before retry...")
+                    await asyncio.sleep(10 + (attempt * 5))
+                    continue
+
+                if status == 200:
+                    try:
+                        tokens, rejected = decode_tokens(body)
+                    except ValueError as e:
+                        logger.error("JSON decode error: %s", e)
+                        await asyncio.sleep(10 + (attempt * 5))
+                        continue
+
+                    # Filter whole columns at once, then keep the surviving records
+                    columns = filters.decode_columns(tokens)
+                    filtered_tokens = [
+                        tokens[i] for i in filters.survivors(expression, columns)
+                    ]
+                    logger.info(
+                        "Type %s: %d tokens, %d malformed, %d passed the filter",
+                        type_id,
+                        len(tokens),
+                        rejected,
+                        len(filtered_tokens),
+                    )
+                    self.log_sample(type_id, tokens)
+                    return filtered_tokens
+                else:
+                    logger.error("Error: Status code %s", status)
+                    await asyncio.sleep(10 + (attempt * 5))
+
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                logger.error("Request error: %s", str(e) or type(e).__name__)
+                await asyncio.sleep(10 + (attempt * 5))
+            except Exception as e:
+                logger.error(f"Unexpected error: {str(e)}", exc_info=True)
+                await asyncio.sleep(10 + (attempt * 5))
+
+        logger.error("All retry attempts failed")
+        return []
+
+    @commands.command()
+    @commands.is_owner()
+    async def testapis(self, ctx):
+        """Test API connectivity and responses"""
+        logger.info("Starting API tests...")
+        await ctx.send("Starting API connectivity tests...")
+
+        for type_id in [1, 2, 3]:
+            logger.info(f"Testing Bullme API type {type_id}")
+            tokens = await self.fetch_bullme_data(
+                type_id, self.rules.rule_for(ctx.channel.id, ctx.guild and ctx.guild.id)
+            )
+            if tokens:
+                logger.info(f"Bullme API type {type_id} working")
+                test_token = tokens[0]
+                logger.info(
+                    f"Sample token found: {test_token.name} ({test_token.symbol})"
+                )
+                logger.info("Token details:")
+                logger.info(f"  - Address: {test_token.address}")
+                logger.info(f"  - Market Cap: ${test_token.market_cap:,.2f}")
+                logger.info(f"  - Volume 24h: ${test_token.volume:,.2f}")
+                logger.info(f"  - Liquidity: ${test_token.liquidity:,.2f}")
+                logger.info(f"  - Holders: {test_token.holders:g}")
+                logger.info(f"  - 24h Price Change: {test_token.progress}%")
+            else:
+                logger.error(f"Bullme API type {type_id} failed")
+
+        logger.info("API tests completed")
+        await ctx.send("API tests completed - check console for detailed results")
+
+    @commands.command()
+    @commands.is_owner()
+    async def forcescan(self, ctx):
+        """Force an immediate token scan"""
+        logger.info("Starting forced token scan")
+        await ctx.send("Starting forced token scan...")
+        channel = self.bot.get_channel(self.channel_id)
+        if channel:
+            # Fetch every feed at once, then alert in feed order
+            results = await asyncio.gather(
+                *(self.fetch_bullme_data(type_id) for type_id in TOKEN_FEEDS)
+            )
+            for type_name, tokens in zip(TOKEN_FEEDS.values(), results):
+                await self.announce_tokens(channel, type_name, tokens)
+        logger.info("Forced scan completed")
+        await ctx.send("Forced scan completed")
+
+    @commands.command()
+    @commands.is_owner()
+    async def memefilter(self, ctx, action: str = "show", *, rule: str = ""):
+        """Show or change the token filter rule for this channel or server
+
+        Actions: show, set, setguild, reset, resetguild. Rules can use mcap,
+        volume, liquidity, holders, progress, age_hours and price with numbers,
+        + - * /, comparisons, and/or/not, abs, min and max, for example
+        `10000 <= mcap <= 100000 and holders >= 50 and age_hours < 24`.
+        """
+        action = action.lower()
+        guild_id = ctx.guild.id if ctx.guild else None
+        if action == "show":
+            await ctx.send(
+                f"Filter rule here: `{self.rules.rule_for(ctx.channel.id, guild_id)}`"
+            )
+            return
+        if action in ("setguild", "resetguild") and guild_id is None:
+            await ctx.send("Server rules can only be changed inside a server.")
+            return
+        if action in ("set", "setguild") and not rule:
+            await ctx.send("Give the rule to use after the action.")
+            return
+
+        scope, key = (
+            (self.rules.guilds, guild_id)
+            if action.endswith("guild")
+            else (self.rules.channels, ctx.channel.id)
+        )
+        try:
+            if action in ("set", "setguild"):
+                self.rules.set(scope, key, rule)
+            elif action in ("reset", "resetguild"):
+                self.rules.set(scope, key, None)
+            else:
+                await ctx.send(
+                    "Use `show`, `set`, `setguild`, `reset` or `resetguild`."
+                )
+                return
+        except ExpressionError as e:
+            await ctx.send(f"Invalid filter rule: {e}")
+            return
+
+        await asyncio.to_thread(
+            self.filters_path.write_text,
+            json.dumps(self.rules.to_dict()),
+            encoding="utf-8",
+        )
+        await ctx.send(
+            f"Filter rule here is now `{self.rules.rule_for(ctx.channel.id, guild_id)}`"
+        )
@@ -0,0 +1,123 @@
+import json
+from datetime import datetime
+from typing import Any, List, Optional, Tuple
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; the standard library parser also works
+    orjson = None
+
+# Parses a response body (bytes) into Python objects
+loads = orjson.loads if orjson is not None else json.loads
+
+
+def _number(value: Any) -> float:
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    if isinstance(value, str):
+        return float(value)
+    raise TypeError(f"expected a number, got {type(value).__name__}")
+
+
+def _text(value: Any, default: str) -> str:
+    return value if isinstance(value, str) and value else default
+
+
+class Token:
+    """The fields of one Bullme token the scanner uses, typed and validated."""
+
+    __slots__ = (
+        "address",
+        "name",
+        "symbol",
+        "market_cap",
+        "volume",
+        "liquidity",
+        "holders",
+        "progress",
+        "supply",
+        "decimals",
+        "timestamp",
+    )
+    chain = "solana"
+
+    def __init__(
+        self,
+        address: str,
+        name: str,
+        symbol: str,
+        market_cap: float,
+        volume: float,
+        liquidity: float,
+        holders: float,
+        progress: float,
+        supply: float,
+        decimals: float,
+        timestamp: float,
+    ):
+        self.address = address
+        self.name = name
+        self.symbol = symbol
+        self.market_cap = market_cap
+        self.volume = volume  # Trade volume
+        self.liquidity = liquidity
+        self.holders = holders  # Top 10 holder share, in percent
+        self.progress = progress  # Bonding curve progress
+        self.supply = supply  # Total supply in whole tokens
+        self.decimals = decimals
+        self.timestamp = timestamp  # Creation time, in milliseconds
+
+    @classmethod
+    def from_payload(cls, item: Any) -> Optional["Token"]:
+        """Validate one raw token; returns None if it is malformed."""
+        if not isinstance(item, dict):
+            return None
+        address = item.get("address")
+        if not isinstance(address, str) or not address:
+            return None
+        try:
+            return cls(
+                address,
+                _text(item.get("name"), "Unknown"),
+                _text(item.get("symbol"), "Unknown"),
+                _number(item.get("marketCap", 0)),
+                _number(item.get("tradeVolume", 0)),
+                _number(item.get("liquidity", 0)),
+                _number(item.get("top10Holder", 0)) * 100,
+                _number(item.get("bondingCurveProgress", 0)),
+                _number(item.get("totalSupply", 0)),
+                _number(item.get("decimals", 6)),
+                _number(item.get("timestamp", 0)),
+            )
+        except (TypeError, ValueError):
+            return None
+
+    @property
+    def price_usd(self) -> float:
+        raw_supply = self.supply * 10**self.decimals
+        return self.market_cap / raw_supply if raw_supply else 0.0
+
+    @property
+    def created_at(self) -> datetime:
+        return datetime.fromtimestamp(self.timestamp / 1000)
+
+    def __repr__(self) -> str:
+        return f"Token({self.symbol!r}, {self.address!r})"
+
+
+def decode_tokens(body: bytes) -> Tuple[List[Token], int]:
+    """Parse a token list response into records, returning ``(tokens, rejected)``.
+
+    Raises ``ValueError`` if the body isn't JSON. Everything that doesn't look
+    like a token is dropped here, so later stages can trust every field.
+    """
+    data = loads(body)
+    items = data.get("data") if isinstance(data, dict) else None
+    if not isinstance(items, list):
+        return [], 0
+    tokens = []
+    for item in items:
+        token = Token.from_payload(item)
+        if token is not None:
+            tokens.append(token)
+    return tokens, len(items) - len(tokens)
@@ -0,0 +1,154 @@
+import asyncio
+import logging
+import os
+import pathlib
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+SEEN_TTL_SECONDS: float = 7 * 86400  # Addresses are forgotten after this long
+SEEN_BUCKET_SECONDS: float = 3600.0  # Time span sharing one bucket and one file
+MAX_SEEN_TOKENS: int = 100_000  # Hard cap; the oldest addresses go first
+
+Snapshot = Tuple[Dict[int, List[str]], List[int]]
+
+
+class SeenIndex:
+    """Token addresses already alerted on, expiring by age and capped in size.
+
+    Addresses are grouped into time buckets. Whole buckets expire once older
+    than ``ttl``, and the oldest addresses are dropped when ``max_size`` is
+    reached, so memory stays bounded. Each bucket is saved as its own file
+    under ``path`` and ``flush`` only rewrites buckets that changed, so a
+    restart resumes with the same index without rewriting all of it.
+    """
+
+    def __init__(
+        self,
+        path: Optional[pathlib.Path] = None,
+        ttl: float = SEEN_TTL_SECONDS,
+        bucket_seconds: float = SEEN_BUCKET_SECONDS,
+        max_size: int = MAX_SEEN_TOKENS,
+    ):
+        self.path = path
+        self.ttl = ttl
+        self.bucket_seconds = bucket_seconds
+        self.max_size = max_size
+        self._bucket_of: Dict[str, int] = {}  # Address -> bucket it was added to
+        # Bucket id -> its addresses in insertion order, oldest bucket first
+        self._buckets: "OrderedDict[int, Dict[str, None]]" = OrderedDict()
+        self._dirty: Set[int] = set()
+        self._removed: Set[int] = set()
+        self._flush_lock = asyncio.Lock()  # One writer at a time per bucket file
+
+    def __len__(self) -> int:
+        return len(self._bucket_of)
+
+    def __contains__(self, address: str) -> bool:
+        self._expire()
+        return address in self._bucket_of
+
+    def add(self, address: str) -> None:
+        """Remember ``address`` as seen from now on."""
+        self._expire()
+        if address in self._bucket_of:
+            return
+        bucket_id = self._bucket_id(time.time())
+        self._buckets.setdefault(bucket_id, {})[address] = None
+        self._bucket_of[address] = bucket_id
+        self._dirty.add(bucket_id)
+        self._removed.discard(bucket_id)
+        while len(self._bucket_of) > self.max_size:
+            self._drop_oldest()
+
+    def _bucket_id(self, timestamp: float) -> int:
+        return int(timestamp // self.bucket_seconds)
+
+    def _expire(self) -> None:
+        oldest = self._bucket_id(time.time() - self.ttl)
+        while self._buckets and next(iter(self._buckets)) < oldest:
+            bucket_id, addresses = self._buckets.popitem(last=False)
+            for address in addresses:
+                del self._bucket_of[address]
+            self._forget_bucket(bucket_id)
+
+    def _drop_oldest(self) -> None:
+        bucket_id, addresses = next(iter(self._buckets.items()))
+        address = next(iter(addresses))
+        del addresses[address]
+        del self._bucket_of[address]
+        if addresses:
+            self._dirty.add(bucket_id)
+        else:
+            del self._buckets[bucket_id]
+            self._forget_bucket(bucket_id)
+
+    def _forget_bucket(self, bucket_id: int) -> None:
+        self._dirty.discard(bucket_id)
+        self._removed.add(bucket_id)
+
+    async def load(self) -> None:
+        """Read the saved buckets that haven't expired yet."""
+        if self.path is None:
+            return
+        buckets = await asyncio.to_thread(self._read_files)
+        for bucket_id, addresses in sorted(buckets.items()):
+            if not addresses:
+                continue
+            bucket = self._buckets.setdefault(bucket_id, {})
+            for address in addresses:
+                if address not in self._bucket_of:
+                    bucket[address] = None
+                    self._bucket_of[address] = bucket_id
+        self._buckets = OrderedDict(sorted(self._buckets.items()))
+        self._expire()
+        while len(self._bucket_of) > self.max_size:
+            self._drop_oldest()
+        logger.info(f"Loaded {len(self)} seen tokens")
+
+    async def flush(self) -> None:
+        """Write changed buckets and delete expired ones."""
+        self._expire()
+        if self.path is None:
+            return
+        async with self._flush_lock:
+            if not (self._dirty or self._removed):
+                return
+            # Copy on the event loop; only the file writes happen on the thread
+            snapshot: Snapshot = (
+                {bucket: list(self._buckets[bucket]) for bucket in self._dirty},
+                list(self._removed),
+            )
+            self._dirty.clear()
+            self._removed.clear()
+            await asyncio.to_thread(self._write_files, snapshot)
+
+    def _file(self, bucket_id: int) -> pathlib.Path:
+        return self.path / f"{bucket_id}.txt"
+
+    def _read_files(self) -> Dict[int, List[str]]:
+        buckets = {}
+        if not self.path.is_dir():
+            return buckets
+        for file in self.path.glob("*.txt"):
+            try:
+                buckets[int(file.stem)] = file.read_text(encoding="utf-8").split()
+            except (OSError, ValueError) as e:
+                logger.warning(f"Skipping unreadable seen-token file {file}: {e}")
+        return buckets
+
+    def _write_files(self, snapshot: Snapshot) -> None:
+        written, removed = snapshot
+        self.path.mkdir(parents=True, exist_ok=True)
+        for bucket_id, addresses in written.items():
+            file = self._file(bucket_id)
+            temp = file.with_suffix(".tmp")
+            temp.write_text("\n".join(addresses), encoding="utf-8")
+            os.replace(temp, file)
+        for bucket_id in removed:
+            try:
+                self._file(bucket_id).unlink()
+            except FileNotFoundError:
+                pass